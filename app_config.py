@@ -0,0 +1,120 @@
+import base64
+import json
+import os
+import sys
+
+import persistence
+
+KEYRING_SERVICE = "schugaa"
+KEYRING_MARKER = "__keyring__"
+
+
+def _get_keyring():
+    try:
+        import keyring
+        return keyring
+    except Exception:
+        return None
+
+def get_keyring_password(email):
+    keyring = _get_keyring()
+    if not keyring or not email:
+        return None
+    try:
+        return keyring.get_password(KEYRING_SERVICE, email)
+    except Exception:
+        return None
+
+def set_keyring_password(email, password):
+    keyring = _get_keyring()
+    if not keyring or not email or not password:
+        return False
+    try:
+        keyring.set_password(KEYRING_SERVICE, email, password)
+        return True
+    except Exception:
+        return False
+
+def delete_keyring_password(email):
+    keyring = _get_keyring()
+    if not keyring or not email:
+        return False
+    try:
+        keyring.delete_password(KEYRING_SERVICE, email)
+        return True
+    except Exception:
+        return False
+
+def write_json_secure(path, data):
+    persistence.write_json(path, data, indent=4)
+
+def resource_path(relative_path):
+    """ Get absolute path to resource, works for dev and for PyInstaller """
+    try:
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+
+    return os.path.join(base_path, relative_path)
+
+def get_app_dir():
+    app_dir = os.path.join(os.path.expanduser("~"), ".schugaa")
+    if not os.path.exists(app_dir):
+        os.makedirs(app_dir, exist_ok=True)
+    return app_dir
+
+def get_config_path():
+    return os.path.join(get_app_dir(), "config.json")
+
+def load_config_data():
+    """The stored config as written (email and password still encoded), or None."""
+    config_path = get_config_path()
+    if os.path.exists(config_path):
+        try:
+            with open(config_path, "r") as f:
+                return json.load(f)
+        except:
+            pass
+
+    try:
+        with open(resource_path("config.json"), "r") as f:
+            return json.load(f)
+    except:
+        return None
+
+def decode_email(value):
+    try:
+        return base64.b64decode(value).decode('utf-8')
+    except Exception:
+        return value
+
+def decode_config(config):
+    """Decode the base64 email/password in a stored config and resolve Keychain passwords."""
+    config = dict(config or {})
+    if "email" in config:
+        config["email"] = decode_email(config["email"])
+
+    if "password" in config:
+        try:
+            config["password"] = base64.b64decode(config["password"]).decode('utf-8')
+        except:
+            pass
+    if not config.get("password") or config.get("password") == KEYRING_MARKER:
+        kr_pw = get_keyring_password(config.get("email"))
+        if kr_pw:
+            config["password"] = kr_pw
+
+    return config
+
+def has_credentials(config):
+    """True if a stored config has an email and a password (inline or in the keyring)."""
+    if not config or not config.get("email"):
+        return False
+    return bool(config.get("password") or get_keyring_password(decode_email(config["email"])))
+
+def encode_credentials(email, password):
+    """(email, password) as stored in config.json; the password goes to the keyring when possible."""
+    email_b64 = base64.b64encode(email.encode('utf-8')).decode('utf-8')
+    if set_keyring_password(email, password):
+        return email_b64, KEYRING_MARKER
+    return email_b64, base64.b64encode(password.encode('utf-8')).decode('utf-8')
@@ -0,0 +1,200 @@
+"""Queue-backed logging for the app.
+
+print() output (and anything sent through the logging module) is put on a
+queue by the calling thread and written out by one background listener, so
+the AppKit main thread never waits on disk. The listener writes a rotating
+log file and the console, and keeps the most recent records in memory for
+"Share Debug Logs".
+
+    SCHUGAA_LOG_LEVEL=DEBUG|INFO|WARNING|ERROR   (default INFO)
+"""
+import atexit
+import io
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+import zipfile
+from collections import deque
+from datetime import datetime
+
+LOG_DIR = os.path.expanduser("~/Library/Logs/Schugaa")
+LOG_FILE = "schugaa.log"
+MAX_BYTES = 1024 * 1024
+MAX_AGE = 24 * 60 * 60
+BACKUP_COUNT = 5
+RING_SIZE = 2000
+FORMAT = "%(asctime)s %(levelname)s [%(threadName)s] %(name)s: %(message)s"
+
+_listener = None
+_queue = None
+_ring = None
+_original_streams = None
+
+
+class RotatingLogFile(logging.handlers.RotatingFileHandler):
+    """Rolls over when the file reaches max_bytes or is older than max_age seconds."""
+
+    def __init__(self, filename, max_bytes=MAX_BYTES, max_age=MAX_AGE, backup_count=BACKUP_COUNT):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        self.max_age = max_age
+        try:
+            self._opened_at = os.path.getmtime(filename) if os.path.getsize(filename) else time.time()
+        except OSError:
+            self._opened_at = time.time()
+
+    def _open(self):
+        stream = super()._open()
+        try:
+            os.chmod(self.baseFilename, 0o600)
+        except OSError:
+            pass
+        return stream
+
+    def shouldRollover(self, record):
+        if self.max_age and time.time() - self._opened_at >= self.max_age:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self._opened_at = time.time()
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the last `capacity` records as plain dicts."""
+
+    def __init__(self, capacity=RING_SIZE):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+
+    def emit(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "thread": record.threadName,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        with self.lock:
+            self.records.append(entry)
+
+    def snapshot(self):
+        with self.lock:
+            return list(self.records)
+
+
+class LogStream(io.TextIOBase):
+    """Stands in for sys.stdout/sys.stderr: each complete line becomes a log record."""
+
+    def __init__(self, logger, level):
+        self.logger = logger
+        self.level = level
+        self._local = threading.local()
+
+    def writable(self):
+        return True
+
+    def write(self, message):
+        buffer = getattr(self._local, "buffer", "") + message
+        *lines, buffer = buffer.split("\n")
+        self._local.buffer = buffer
+        for line in lines:
+            if line.strip():
+                self.logger.log(self.level, line.rstrip())
+        return len(message)
+
+    def flush(self):
+        buffer = getattr(self._local, "buffer", "")
+        if buffer.strip():
+            self.logger.log(self.level, buffer.rstrip())
+        self._local.buffer = ""
+
+
+def _level():
+    level = logging.getLevelName(os.environ.get("SCHUGAA_LOG_LEVEL", "INFO").upper())
+    return level if isinstance(level, int) else logging.INFO
+
+
+def setup_logging(log_dir=LOG_DIR, console=True, capture_print=True):
+    """Route logging (and print, unless capture_print is False) through a background writer."""
+    global _listener, _queue, _ring, _original_streams
+    if _listener is not None:
+        return _ring
+
+    os.makedirs(log_dir, exist_ok=True)
+    formatter = logging.Formatter(FORMAT)
+    handlers = []
+
+    try:
+        file_handler = RotatingLogFile(os.path.join(log_dir, LOG_FILE))
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+    except Exception as e:
+        print(f"Failed to open log file: {e}")
+
+    if console:
+        console_handler = logging.StreamHandler(sys.__stdout__ or sys.stdout)
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+
+    _ring = RingBufferHandler()
+    handlers.append(_ring)
+
+    _queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(_level())
+    root.addHandler(logging.handlers.QueueHandler(_queue))
+    _listener = logging.handlers.QueueListener(_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown)
+
+    if capture_print:
+        _original_streams = (sys.stdout, sys.stderr)
+        sys.stdout = LogStream(logging.getLogger("schugaa"), logging.INFO)
+        sys.stderr = LogStream(logging.getLogger("schugaa.stderr"), logging.ERROR)
+    logging.captureWarnings(True)
+    # A failing handler would otherwise report through stderr, i.e. back into the queue
+    logging.raiseExceptions = False
+    return _ring
+
+
+def shutdown():
+    """Write out everything still queued. Safe to call more than once."""
+    global _listener, _original_streams
+    if _original_streams is not None:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        sys.stdout, sys.stderr = _original_streams
+        _original_streams = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        for handler in logging.getLogger().handlers[:]:
+            if isinstance(handler, logging.handlers.QueueHandler):
+                logging.getLogger().removeHandler(handler)
+
+
+def recent_records(wait=1.0):
+    """Records in the ring buffer, after giving the listener up to `wait` seconds to catch up."""
+    deadline = time.monotonic() + wait
+    while _listener is not None and not _queue.empty() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return _ring.snapshot() if _ring is not None else []
+
+
+def export_debug_bundle(log_dir=LOG_DIR, extra=None):
+    """Zip the in-memory records (plus `extra` name -> JSON-able data) for sharing; returns the path."""
+    os.makedirs(log_dir, exist_ok=True)
+    path = os.path.join(log_dir, f"schugaa-debug-{datetime.now().strftime('%Y%m%d-%H%M%S')}.zip")
+    records = recent_records()
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as bundle:
+        bundle.writestr("recent.jsonl", "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+        for name, data in (extra or {}).items():
+            bundle.writestr(name, json.dumps(data, indent=2, default=str))
+    os.chmod(path, 0o600)
+    return path
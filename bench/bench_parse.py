@@ -0,0 +1,40 @@
+"""Compare the fast graph parser with full pydantic validation.
+
+    python -m bench.bench_parse [--repeat N]
+"""
+import argparse
+import time
+
+from graph_parser import parse_graph, parse_graph_strict
+from bench.fixtures import SIZES, make_graph_response
+
+
+def best_of(func, payload, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(payload)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'size':>5} {'points':>7} {'strict ms':>10} {'fast ms':>9} {'speedup':>8}")
+    for name, span in SIZES.items():
+        payload = make_graph_response(span)
+        fast = parse_graph(payload)
+        strict = parse_graph_strict(payload)
+        assert list(fast.history) == list(strict.history) and fast.current == strict.current
+
+        strict_time = best_of(parse_graph_strict, payload, args.repeat)
+        fast_time = best_of(parse_graph, payload, args.repeat)
+        print(f"{name:>5} {len(fast.history):>7} {strict_time * 1000:>10.2f} {fast_time * 1000:>9.2f} "
+              f"{strict_time / fast_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
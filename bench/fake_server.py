@@ -0,0 +1,386 @@
+"""A local stand-in for the LibreLinkUp API, for load and fault-injection testing.
+
+    python -m bench.fake_server --port 8080 --home-region eu --latency 0.2 \\
+        --burst-every 50 --burst-length 5 --signal-loss-every 10
+
+Point the app or daemon at it with SCHUGAA_API_URL=http://127.0.0.1:8080/{region}.
+Each region is a path prefix (/eu/llu/..., /us/llu/...). Logging in anywhere
+but --home-region answers with a redirect, the same way Abbott does.
+
+Endpoints:
+    POST /<region>/llu/auth/login
+    GET  /<region>/llu/connections
+    GET  /<region>/llu/connections/<patient_id>/graph
+    GET  /_stats              counters, as JSON
+    POST /_control            JSON body updates any FakeLibreLinkUp setting at runtime
+"""
+import argparse
+import json
+import random
+import re
+import secrets
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pylibrelinkup.api_url import APIUrl
+
+from bench.fixtures import SIZES, make_graph_response
+
+REGIONS = {member.name.lower() for member in APIUrl}
+
+_GRAPH_PATH = re.compile(r"^/llu/connections/([0-9a-fA-F-]{36})/graph$")
+
+
+class FakeLibreLinkUp:
+    """State and fault settings shared by all request handlers.
+
+    latency/jitter        seconds added to every API response
+    burst_every           start a burst of 429s every N-th API request (0 = never)
+    burst_length          number of 429s in a burst
+    rate_limit            fixed-window limit: at most N API requests per rate_window seconds (0 = off)
+    retry_after           Retry-After seconds sent with every 429 (None = header omitted)
+    signal_loss_every     every N-th graph response has a null glucoseMeasurement (0 = never)
+    signal_loss           force signal loss on every graph response
+    token_ttl             seconds until an issued token is rejected with 401
+    """
+
+    SETTINGS = ("home_region", "latency", "jitter", "burst_every", "burst_length", "rate_limit",
+                "rate_window", "retry_after", "signal_loss_every", "signal_loss", "token_ttl", "history")
+
+    def __init__(self, home_region="eu", patients=1, latency=0.0, jitter=0.0, burst_every=0,
+                 burst_length=3, rate_limit=0, rate_window=60, retry_after=5, signal_loss_every=0,
+                 signal_loss=False, token_ttl=3600, history="12h", email=None, password=None):
+        self.home_region = home_region
+        self.latency = latency
+        self.jitter = jitter
+        self.burst_every = burst_every
+        self.burst_length = burst_length
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.retry_after = retry_after
+        self.signal_loss_every = signal_loss_every
+        self.signal_loss = signal_loss
+        self.token_ttl = token_ttl
+        self.history = history
+        # None accepts any credentials
+        self.email = email
+        self.password = password
+
+        self.patients = [str(uuid.UUID(int=i + 1)) for i in range(patients)]
+        self.account_id = str(uuid.UUID(int=0xACC0))
+
+        self._lock = threading.Lock()
+        self._tokens = {}
+        self._burst_remaining = 0
+        self._window_start = time.time()
+        self._window_count = 0
+        self._graph_count = 0
+        self.counters = {
+            "requests": 0,
+            "logins": 0,
+            "redirects": 0,
+            "connections": 0,
+            "graphs": 0,
+            "signal_loss": 0,
+            "rate_limited": 0,
+            "unauthorized": 0,
+            "not_found": 0,
+        }
+
+    def update(self, settings):
+        with self._lock:
+            for key, value in settings.items():
+                if key in self.SETTINGS:
+                    setattr(self, key, value)
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counters, active_tokens=len(self._tokens))
+
+    def count(self, key):
+        with self._lock:
+            self.counters[key] += 1
+
+    def delay(self):
+        wait = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+        if wait > 0:
+            time.sleep(wait)
+
+    def should_rate_limit(self):
+        """Decide, per API request, whether it gets a 429."""
+        with self._lock:
+            self.counters["requests"] += 1
+            n = self.counters["requests"]
+
+            if self._burst_remaining:
+                self._burst_remaining -= 1
+                limited = True
+            elif self.burst_every and n % self.burst_every == 0:
+                self._burst_remaining = max(0, self.burst_length - 1)
+                limited = True
+            else:
+                limited = False
+
+            if not limited and self.rate_limit:
+                now = time.time()
+                if now - self._window_start >= self.rate_window:
+                    self._window_start = now
+                    self._window_count = 0
+                self._window_count += 1
+                limited = self._window_count > self.rate_limit
+
+            if limited:
+                self.counters["rate_limited"] += 1
+            return limited
+
+    def issue_token(self):
+        token = secrets.token_urlsafe(24)
+        expires = int(time.time() + self.token_ttl)
+        with self._lock:
+            self._tokens[token] = expires
+        return token, expires
+
+    def token_valid(self, token):
+        with self._lock:
+            expires = self._tokens.get(token)
+            if expires is None:
+                return False
+            if expires < time.time():
+                del self._tokens[token]
+                return False
+            return True
+
+    def take_signal_loss(self):
+        with self._lock:
+            self._graph_count += 1
+            if self.signal_loss:
+                return True
+            return bool(self.signal_loss_every) and self._graph_count % self.signal_loss_every == 0
+
+    def login_response(self, token, expires):
+        now = int(time.time())
+        return {
+            "status": 0,
+            "data": {
+                "user": {
+                    "id": self.account_id,
+                    "firstName": "Fake",
+                    "lastName": "Follower",
+                    "email": self.email or "fake@example.com",
+                    "country": self.home_region.upper(),
+                    "emailDay": [1],
+                    "system": {"messages": {}},
+                    "details": {},
+                    "created": now - 86400,
+                    "lastLogin": now,
+                    "programs": {},
+                    "dateOfBirth": 0,
+                    "practices": {},
+                    "devices": {},
+                    "consents": {},
+                },
+                "messages": {"unread": 0},
+                "notifications": {"unresolved": 0},
+                "authTicket": {"token": token, "expires": expires, "duration": self.token_ttl * 1000},
+                "invitations": [],
+            },
+        }
+
+    def connections_response(self):
+        return {
+            "status": 0,
+            "data": [
+                {"id": pid, "patientId": pid, "firstName": "Patient", "lastName": str(i)}
+                for i, pid in enumerate(self.patients)
+            ],
+        }
+
+    def graph_response(self, patient_id):
+        index = self.patients.index(patient_id)
+        span = SIZES.get(self.history, SIZES["12h"])
+        signal_loss = self.take_signal_loss()
+        if signal_loss:
+            self.count("signal_loss")
+        return make_graph_response(span, patient_id=patient_id, signal_loss=signal_loss,
+                                   serial=f"3MH00FAKE{index}", seed=index)
+
+
+class FakeLibreLinkUpHandler(BaseHTTPRequestHandler):
+    server_version = "FakeLibreLinkUp/1.0"
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; don't let Nagle hold the body back
+    disable_nagle_algorithm = True
+
+    @property
+    def fake(self):
+        return self.server.fake
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, body, headers=None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length))
+        except ValueError:
+            return {}
+
+    def _split_region(self):
+        parts = self.path.split("?", 1)[0].split("/", 2)
+        if len(parts) < 3 or parts[1] not in REGIONS:
+            return None, self.path
+        return parts[1], "/" + parts[2]
+
+    def _api_preamble(self):
+        """Latency and rate limiting common to all API endpoints; False if already answered."""
+        self.fake.delay()
+        if self.fake.should_rate_limit():
+            headers = {}
+            if self.fake.retry_after is not None:
+                headers["Retry-After"] = str(self.fake.retry_after)
+            self._send_json(429, {"status": 429, "error": {"message": "Too many requests"}}, headers)
+            return False
+        return True
+
+    def _authorized(self):
+        auth = self.headers.get("authorization", "")
+        token = auth[7:] if auth.startswith("Bearer ") else ""
+        if self.fake.token_valid(token):
+            return True
+        self.fake.count("unauthorized")
+        self._send_json(401, {"status": 401, "error": {"message": "notAuthenticated"}})
+        return False
+
+    def do_GET(self):
+        if self.path == "/_stats":
+            return self._send_json(200, self.fake.stats())
+
+        region, path = self._split_region()
+        if region is None:
+            return self._send_json(404, {"status": 404, "error": {"message": "unknown path"}})
+        if not self._api_preamble() or not self._authorized():
+            return
+
+        if path == "/llu/connections":
+            self.fake.count("connections")
+            return self._send_json(200, self.fake.connections_response())
+
+        match = _GRAPH_PATH.match(path)
+        if match:
+            patient_id = match.group(1)
+            if patient_id not in self.fake.patients:
+                self.fake.count("not_found")
+                return self._send_json(200, {"status": 4, "error": {"message": "couldNotLoadPatient"}})
+            self.fake.count("graphs")
+            return self._send_json(200, self.fake.graph_response(patient_id))
+
+        self._send_json(404, {"status": 404, "error": {"message": "unknown path"}})
+
+    def do_POST(self):
+        if self.path == "/_control":
+            self.fake.update(self._read_json())
+            return self._send_json(200, {"status": 0})
+
+        region, path = self._split_region()
+        if region is None or path != "/llu/auth/login":
+            return self._send_json(404, {"status": 404, "error": {"message": "unknown path"}})
+
+        body = self._read_json()
+        if not self._api_preamble():
+            return
+
+        if region != self.fake.home_region:
+            self.fake.count("redirects")
+            return self._send_json(200, {"status": 0, "data": {"redirect": True, "region": self.fake.home_region}})
+
+        if ((self.fake.email is not None and body.get("email") != self.fake.email) or
+                (self.fake.password is not None and body.get("password") != self.fake.password)):
+            return self._send_json(200, {"status": 2, "error": {"message": "notAuthenticated"}})
+
+        self.fake.count("logins")
+        token, expires = self.fake.issue_token()
+        self._send_json(200, self.fake.login_response(token, expires))
+
+
+class FakeLibreLinkUpServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=("127.0.0.1", 0), fake=None, verbose=False):
+        super().__init__(address, FakeLibreLinkUpHandler)
+        self.fake = fake or FakeLibreLinkUp()
+        self.verbose = verbose
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def api_url_template(self):
+        """Value for LibreClient(api_url=...) / SCHUGAA_API_URL."""
+        return self.base_url + "/{region}"
+
+    def start(self):
+        """Serve from a background thread; returns self."""
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-llu", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--home-region", default="eu", choices=sorted(REGIONS))
+    parser.add_argument("--patients", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--burst-every", type=int, default=0)
+    parser.add_argument("--burst-length", type=int, default=3)
+    parser.add_argument("--rate-limit", type=int, default=0)
+    parser.add_argument("--rate-window", type=float, default=60)
+    parser.add_argument("--retry-after", type=int, default=5)
+    parser.add_argument("--signal-loss-every", type=int, default=0)
+    parser.add_argument("--token-ttl", type=int, default=3600)
+    parser.add_argument("--history", default="12h", choices=sorted(SIZES))
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    fake = FakeLibreLinkUp(
+        home_region=args.home_region, patients=args.patients, latency=args.latency, jitter=args.jitter,
+        burst_every=args.burst_every, burst_length=args.burst_length, rate_limit=args.rate_limit,
+        rate_window=args.rate_window, retry_after=args.retry_after,
+        signal_loss_every=args.signal_loss_every, token_ttl=args.token_ttl, history=args.history,
+    )
+    server = FakeLibreLinkUpServer((args.host, args.port), fake, verbose=args.verbose)
+    print(f"Fake LibreLinkUp listening on {server.base_url} (home region {args.home_region})")
+    print(f"SCHUGAA_API_URL={server.api_url_template()}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
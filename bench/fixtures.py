@@ -0,0 +1,122 @@
+"""Synthetic graph responses for the benchmark suite, bench_parse and the fake server.
+
+These are generated, not recorded: the field set and value types follow a
+LibreLinkUp graph response, but the history is an idealised curve at exact
+15-minute spacing, with no gaps, duplicate timestamps or sensor warm-up.
+Timings are representative of real payloads of the same size, not of any
+particular patient's data.
+"""
+import math
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+
+# LibreLinkUp sends history at 15 minute spacing and the current reading once a minute
+HISTORY_INTERVAL = 15 * 60
+
+SIZES = {
+    "12h": 12 * 60 * 60,
+    "14d": 14 * 24 * 60 * 60,
+    "90d": 90 * 24 * 60 * 60,
+}
+
+
+def format_factory_timestamp(ts):
+    """LibreLinkUp's FactoryTimestamp format (UTC, 12-hour clock, no zero padding)."""
+    dt = datetime.fromtimestamp(ts, tz=timezone.utc)
+    hour = dt.hour % 12 or 12
+    meridiem = "PM" if dt.hour >= 12 else "AM"
+    return f"{dt.month}/{dt.day}/{dt.year} {hour}:{dt.minute:02d}:{dt.second:02d} {meridiem}"
+
+
+def _local_timestamp(ts):
+    dt = datetime.fromtimestamp(ts)
+    hour = dt.hour % 12 or 12
+    meridiem = "PM" if dt.hour >= 12 else "AM"
+    return f"{dt.month}/{dt.day}/{dt.year} {hour}:{dt.minute:02d}:{dt.second:02d} {meridiem}"
+
+
+def glucose_curve(ts, seed=0):
+    """Plausible mg/dL value at ts: daily rhythm plus a meal bump."""
+    day = (ts % 86400) / 86400.0
+    value = 120 + 35 * math.sin(2 * math.pi * (day - 0.25))
+    value += 45 * math.exp(-((day - 0.55) * 24) ** 2 / 2)
+    value += 10 * math.sin(ts / 1700.0 + seed)
+    return max(40.0, min(400.0, round(value)))
+
+
+def measurement(ts, value, trend=None):
+    item = {
+        "FactoryTimestamp": format_factory_timestamp(ts),
+        "Timestamp": _local_timestamp(ts),
+        "type": 0 if trend is None else 1,
+        "ValueInMgPerDl": value,
+        "MeasurementColor": 1,
+        "GlucoseUnits": 1,
+        "Value": value,
+        "isHigh": value > 250,
+        "isLow": value < 70,
+    }
+    if trend is not None:
+        item["TrendArrow"] = trend
+        item["TrendMessage"] = None
+        item["alarmType"] = 0
+    return item
+
+
+def make_graph_response(span_seconds=SIZES["12h"], now=None, patient_id=None, signal_loss=False,
+                        serial="3MH00XYZ0A", seed=0):
+    """A graph endpoint response shaped like LibreLinkUp's, covering span_seconds of history."""
+    now = int(time.time()) if now is None else int(now)
+    now -= now % 60
+    patient_id = patient_id or str(uuid.UUID(int=seed + 1))
+    rng = random.Random(seed)
+
+    last_history = now - now % HISTORY_INTERVAL
+    start = last_history - span_seconds
+    graph_data = [measurement(ts, glucose_curve(ts, seed))
+                  for ts in range(start + HISTORY_INTERVAL, last_history + 1, HISTORY_INTERVAL)]
+
+    activated = now - rng.randint(1, 13) * 86400
+    sensor = {"deviceId": "", "sn": serial, "a": activated, "w": 60, "pt": 4, "s": False, "lj": False}
+    current = None if signal_loss else measurement(now, glucose_curve(now, seed), trend=rng.randint(1, 5))
+
+    device = {"did": "", "dtid": 40068, "v": "3.6.0", "ll": 70, "hl": 250, "u": 0,
+              "fixedLowAlarmValues": {"mgdl": 60, "mmoll": 3.3}, "alarms": False, "fixedLowThreshold": 0}
+    rule_limits = {"th": 130, "thmm": 7.2, "d": 1440, "tl": 10, "tlmm": 0.6}
+    return {
+        "status": 0,
+        "data": {
+            "connection": {
+                "id": str(uuid.UUID(int=seed + 1000)),
+                "patientId": patient_id,
+                "country": "DE",
+                "status": 2,
+                "firstName": "Bench",
+                "lastName": f"Patient{seed}",
+                "targetLow": 70,
+                "targetHigh": 180,
+                "uom": 1,
+                "sensor": sensor,
+                "alarmRules": {
+                    "c": True,
+                    "h": {"th": 250, "thmm": 13.9, "d": 1440, "f": 0.1},
+                    "f": dict(rule_limits),
+                    "l": dict(rule_limits),
+                    "nd": {"i": 15, "r": 5, "l": 5},
+                    "p": 5,
+                    "r": 5,
+                    "std": {},
+                },
+                "glucoseMeasurement": current,
+                "glucoseItem": current,
+                "glucoseAlarm": None,
+                "patientDevice": dict(device),
+                "created": activated,
+            },
+            "activeSensors": [{"sensor": dict(sensor), "device": dict(device)}],
+            "graphData": graph_data,
+        },
+        "ticket": {"token": "bench-token", "expires": now + 3600, "duration": 15552000000},
+    }
@@ -0,0 +1,162 @@
+"""Drive LibreClient against the fake LibreLinkUp server and report throughput and recovery.
+
+    python -m bench.load_test --clients 8 --duration 30 --latency 0.05 \\
+        --burst-every 40 --retry-after 1 --signal-loss-every 7 --region us
+
+Each client polls in its own thread as fast as its RequestGovernor allows
+(or every --interval seconds), honouring cooldowns the way the app's
+scheduler does. Recovery is the time from a client's first failed poll to
+its next successful one.
+"""
+import argparse
+import contextlib
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from bench.fake_server import FakeLibreLinkUp, FakeLibreLinkUpServer, REGIONS
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class ClientStats:
+    def __init__(self):
+        self.latencies = []
+        self.ok = 0
+        self.failed = 0
+        self.signal_loss = 0
+        self.recoveries = []
+        self.failing_since = None
+
+
+def poll_loop(client, stats, deadline, interval, all_patients):
+    while time.time() < deadline:
+        start = time.perf_counter()
+        if all_patients:
+            results = client.get_all_glucose()
+            ok = bool(results) and all(r is not None for r in results.values())
+            lost = sum(1 for r in results.values() if r and r.get("Value") is None)
+        else:
+            result = client.get_latest_glucose()
+            ok = result is not None
+            lost = 1 if result and result.get("Value") is None else 0
+        elapsed = time.perf_counter() - start
+        stats.latencies.append(elapsed)
+        stats.signal_loss += lost
+
+        now = time.time()
+        if ok:
+            stats.ok += 1
+            if stats.failing_since is not None:
+                stats.recoveries.append(now - stats.failing_since)
+                stats.failing_since = None
+        else:
+            stats.failed += 1
+            if stats.failing_since is None:
+                stats.failing_since = now
+
+        wait = max(interval, client.governor.cooldown_remaining())
+        if not ok and not wait:
+            # Out of request budget; the governor says when a token frees up
+            wait = 1.0 / client.governor.refill_per_second
+        if wait:
+            time.sleep(min(wait, max(0, deadline - time.time())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--interval", type=float, default=0.0, help="pause between a client's polls")
+    parser.add_argument("--all-patients", action="store_true", help="use get_all_glucose()")
+    parser.add_argument("--patients", type=int, default=1)
+    parser.add_argument("--region", default="eu", choices=sorted(REGIONS),
+                        help="region the clients start in; differs from --home-region to exercise redirects")
+    parser.add_argument("--home-region", default="eu", choices=sorted(REGIONS))
+    parser.add_argument("--budget", type=float, default=600,
+                        help="per-client governor budget, requests per minute")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--burst-every", type=int, default=0)
+    parser.add_argument("--burst-length", type=int, default=3)
+    parser.add_argument("--rate-limit", type=int, default=0)
+    parser.add_argument("--rate-window", type=float, default=60)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--signal-loss-every", type=int, default=0)
+    parser.add_argument("--token-ttl", type=int, default=3600)
+    parser.add_argument("--verbose", action="store_true", help="show the clients' own log output")
+    args = parser.parse_args()
+
+    fake = FakeLibreLinkUp(
+        home_region=args.home_region, patients=args.patients, latency=args.latency, jitter=args.jitter,
+        burst_every=args.burst_every, burst_length=args.burst_length, rate_limit=args.rate_limit,
+        rate_window=args.rate_window, retry_after=args.retry_after,
+        signal_loss_every=args.signal_loss_every, token_ttl=args.token_ttl,
+    )
+    server = FakeLibreLinkUpServer(fake=fake).start()
+    home = tempfile.mkdtemp(prefix="schugaa-load-")
+    real_home = os.environ.get("HOME")
+    os.environ["HOME"] = home
+
+    from libre_api import LibreClient
+    from rate_limit import RequestGovernor
+
+    log = sys.stdout if args.verbose else open(os.devnull, "w")
+    clients = []
+    try:
+        with contextlib.redirect_stdout(log):
+            for i in range(args.clients):
+                governor = RequestGovernor(capacity=max(1, int(args.budget / 10)),
+                                           refill_per_second=args.budget / 60.0,
+                                           base_delay=0.5, max_delay=30,
+                                           state_file=f"ratelimit-{i}.json")
+                client = LibreClient(f"load{i}@example.com", "secret", args.region,
+                                     governor=governor, api_url=server.api_url_template())
+                clients.append((client, ClientStats()))
+
+            deadline = time.time() + args.duration
+            threads = [threading.Thread(target=poll_loop, args=(c, s, deadline, args.interval, args.all_patients))
+                       for c, s in clients]
+            started = time.time()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            wall = time.time() - started
+    finally:
+        server.stop()
+        if log is not sys.stdout:
+            log.close()
+        if real_home is not None:
+            os.environ["HOME"] = real_home
+        shutil.rmtree(home, ignore_errors=True)
+
+    latencies = sorted(l for _, s in clients for l in s.latencies)
+    ok = sum(s.ok for _, s in clients)
+    failed = sum(s.failed for _, s in clients)
+    recoveries = sorted(r for _, s in clients for r in s.recoveries)
+    unrecovered = sum(1 for _, s in clients if s.failing_since is not None)
+    reuse = [c.connection_stats()["reuse_ratio"] for c, _ in clients]
+
+    print(f"clients {args.clients}, {wall:.1f}s: {ok} ok / {failed} failed polls, "
+          f"{ok / wall:.1f} successful polls/s")
+    print(f"poll latency ms: p50 {percentile(latencies, 50) * 1000:.1f}  "
+          f"p95 {percentile(latencies, 95) * 1000:.1f}  p99 {percentile(latencies, 99) * 1000:.1f}")
+    if recoveries:
+        print(f"recovery s: {len(recoveries)} episodes, mean {sum(recoveries) / len(recoveries):.2f}  "
+              f"max {recoveries[-1]:.2f}  still failing at end: {unrecovered}")
+    print(f"signal-loss polls seen: {sum(s.signal_loss for _, s in clients)}")
+    print(f"connection reuse: mean {sum(reuse) / len(reuse):.2f}")
+    print("server: " + ", ".join(f"{k} {v}" for k, v in fake.stats().items()))
+
+
+if __name__ == "__main__":
+    main()
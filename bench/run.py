@@ -0,0 +1,212 @@
+"""Time and measure the fetch, parse and render-prep paths on generated fixtures.
+
+    python -m bench.run                        # all sizes, print a table
+    python -m bench.run --sizes 12h,14d --repeat 50
+    python -m bench.run --save bench/baseline.json
+    python -m bench.run --compare bench/baseline.json [--threshold 1.25]
+
+Everything runs headless: the network is replaced by a synthetic graph
+response (see bench/fixtures.py) and AppKit drawing by the pure geometry it replays, so the numbers
+are comparable between Linux CI and a Mac. Each stage reports the best wall
+time over --repeat runs and the peak traced allocation of one extra run.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from bench.fixtures import SIZES, make_graph_response
+
+
+class _Patient:
+    def __init__(self, patient_id):
+        self.patient_id = patient_id
+
+
+def _bench_client(home):
+    """A LibreClient with its files under `home` that never touches the network."""
+    os.environ["HOME"] = home
+    from libre_api import LibreClient
+
+    client = LibreClient("bench@example.com", "bench")
+    client.client._set_token("bench-token")
+    client.expiry = time.time() + 24 * 60 * 60
+    client._get_patients = lambda: [_Patient("bench-patient")]
+    return client
+
+
+def _render_prep(series):
+    """What GraphPlotView.update_data + drawRect_ do before touching AppKit."""
+    from graph_geometry import compute_geometry
+    from readings import ReadingSeries
+
+    points = ReadingSeries()
+    for ts, val in series:
+        if val:
+            points.append(ts, val)
+    points = points.tail(100)
+    return compute_geometry(points, 450, 300, "mg/dL")
+
+
+def build_stages(payload, home):
+    """(name, callable) pairs for one fixture; each callable is safe to repeat."""
+    from graph_parser import parse_graph, parse_graph_strict
+    from graph_geometry import calculate_stats, select_hour_dots
+    from reading_store import ReadingStore
+
+    client = _bench_client(home)
+    history = parse_graph(payload).history
+    store_counter = [0]
+
+    def get_latest_glucose():
+        # Fresh high-water marks so every run does the full first-poll work
+        client.high_water_marks.clear()
+        client.client._get_graph_data_json = lambda patient_id: payload
+        return client.get_latest_glucose()
+
+    def incremental_poll():
+        client.client._get_graph_data_json = lambda patient_id: payload
+        return client.get_latest_glucose()
+
+    def store_insert():
+        store_counter[0] += 1
+        store = ReadingStore(os.path.join(home, f"store-{store_counter[0]}.db"))
+        try:
+            store.add_readings((ts, value, None) for ts, value in history)
+        finally:
+            store.close()
+
+    values = list(history.values)
+    times = list(history.times)
+    incremental_poll()
+
+    return [
+        ("parse_fast", lambda: parse_graph(payload)),
+        ("parse_strict", lambda: parse_graph_strict(payload)),
+        ("extract_sensor_times", lambda: client._extract_sensor_times(payload)),
+        ("get_latest_glucose", get_latest_glucose),
+        ("incremental_poll", incremental_poll),
+        ("store_insert", store_insert),
+        ("store_read", lambda: client.store.get_range(patient_id="bench-patient")),
+        ("calculate_stats", lambda: calculate_stats(values)),
+        ("select_hour_dots", lambda: select_hour_dots(times)),
+        ("render_prep", lambda: _render_prep(history)),
+    ]
+
+
+def measure(func, repeat):
+    best = float("inf")
+    total = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        best = min(best, elapsed)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"best_ms": best * 1000, "mean_ms": total / repeat * 1000, "peak_kib": peak / 1024}
+
+
+def run(sizes, repeat, stage_filter=None, quiet=False):
+    results = {}
+    for size in sizes:
+        payload = make_graph_response(SIZES[size])
+        points = len(payload["data"]["graphData"])
+        home = tempfile.mkdtemp(prefix="schugaa-bench-")
+        real_home = os.environ.get("HOME")
+        stdout = sys.stdout
+        try:
+            # The client prints on every poll; keep the report readable
+            sys.stdout = open(os.devnull, "w")
+            stages = build_stages(payload, home)
+            for name, func in stages:
+                if stage_filter and name not in stage_filter:
+                    continue
+                results[f"{size}/{name}"] = dict(measure(func, repeat), points=points)
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+            if real_home is not None:
+                os.environ["HOME"] = real_home
+            shutil.rmtree(home, ignore_errors=True)
+        if not quiet:
+            print(f"{size}: {points} history points", file=sys.stderr)
+    return results
+
+
+def print_table(results, baseline=None, threshold=None):
+    header = f"{'stage':<28} {'best ms':>9} {'mean ms':>9} {'peak KiB':>9}"
+    if baseline:
+        header += f" {'vs base':>8}"
+    print(header)
+    regressions = []
+    for key, row in results.items():
+        line = f"{key:<28} {row['best_ms']:>9.3f} {row['mean_ms']:>9.3f} {row['peak_kib']:>9.1f}"
+        base = (baseline or {}).get(key)
+        if base:
+            ratio = row["best_ms"] / base["best_ms"] if base["best_ms"] else 1.0
+            flag = ""
+            if threshold and ratio > threshold:
+                flag = " !"
+                regressions.append((key, ratio))
+            line += f" {ratio:>7.2f}x{flag}"
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(SIZES), help="comma separated, from: " + ", ".join(SIZES))
+    parser.add_argument("--stages", default="", help="comma separated stage names (default: all)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--save", metavar="PATH", help="write results as a baseline JSON file")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="with --compare, exit 1 if any stage is this many times slower")
+    args = parser.parse_args()
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        parser.error(f"unknown size(s): {', '.join(unknown)}")
+    stage_filter = {s.strip() for s in args.stages.split(",") if s.strip()} or None
+
+    results = run(sizes, args.repeat, stage_filter)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    regressions = print_table(results, baseline, args.threshold if baseline else None)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "machine": platform.platform(),
+                "repeat": args.repeat,
+                "results": results,
+            }, f, indent=2)
+        print(f"Baseline saved to {args.save}")
+
+    if regressions:
+        print("Slower than baseline: " + ", ".join(f"{k} ({r:.2f}x)" for k, r in regressions))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
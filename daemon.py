@@ -0,0 +1,153 @@
+"""Headless Schugaa: polls LibreLinkUp and stores readings without the menu bar app.
+
+    python daemon.py [--once] [--all-patients] [--unit mmol/L] [--api-port 8765]
+
+Credentials come from ~/.schugaa/config.json (as written by the app or
+setup_creds.py), or from SCHUGAA_EMAIL / SCHUGAA_PASSWORD / SCHUGAA_REGION
+on machines without one. Nothing here imports rumps, AppKit or objc, so it
+runs on Linux and starts without loading the GUI stack.
+"""
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+
+from app_config import load_config_data, decode_config
+from libre_api import LibreClient
+from local_api import ReadingState, configured_port, start_local_api
+from poll_scheduler import PollScheduler
+from readings import format_time, to_display_value
+
+TREND_ARROWS = {1: "↓", 2: "↘", 3: "→", 4: "↗", 5: "↑"}
+
+
+def load_daemon_config():
+    config = decode_config(load_config_data() or {})
+    for key in ("email", "password", "region", "unit"):
+        value = os.environ.get(f"SCHUGAA_{key.upper()}")
+        if value:
+            config[key] = value
+    return config
+
+
+class GlucoseDaemon:
+    """Runs the app's polling loop (PollScheduler + LibreClient) on a plain thread."""
+
+    def __init__(self, client, scheduler=None, all_patients=False, unit="mg/dL", state=None):
+        self.client = client
+        self.scheduler = scheduler or PollScheduler()
+        self.all_patients = all_patients
+        self.unit = unit
+        # Latest result per patient id ("" for the single-patient mode)
+        self.state = state or ReadingState()
+        self._stop = threading.Event()
+
+    def seed_from_store(self, hours=12):
+        if self.all_patients:
+            return
+        cached = self.client.get_cached_glucose(hours=hours)
+        if cached and cached.get("GraphData"):
+            self.state.seed_history("", cached["GraphData"])
+
+    def poll_once(self):
+        self.scheduler.start_poll()
+        try:
+            if self.all_patients:
+                results = {pid: r for pid, r in self.client.get_all_glucose().items() if r}
+            else:
+                result = self.client.get_latest_glucose(retry=True)
+                results = {"": result} if result else {}
+        except Exception as e:
+            print(f"Error fetching glucose: {e}")
+            results = {}
+
+        timestamps = [r["Timestamp"] for r in results.values() if r.get("Timestamp")]
+        # Answers without a current reading are signal loss, not failed polls
+        decision = self.scheduler.record_poll(max(timestamps) if timestamps else None,
+                                              signal_loss=bool(results) and not timestamps)
+        cooldown = self.client.governor.cooldown_remaining()
+        if cooldown:
+            decision = self.scheduler.defer_until(time.time() + cooldown)
+
+        for patient_id, result in results.items():
+            self.state.update(patient_id, result)
+            self.report(patient_id, result)
+        if not results and self.client.last_error:
+            print(f"Fetch failed: {self.client.last_error.get('message')}")
+        print(f"Next poll in {decision['delay']}s ({decision['reason']}, interval {decision['interval']}s, lag {decision['lag']}s)")
+        return results
+
+    def report(self, patient_id, result):
+        label = f"{patient_id}: " if patient_id else ""
+        if result.get("Value") is None:
+            print(f"{label}no current reading (connection status {result.get('ConnectionStatus')})")
+            return
+        value = to_display_value(result["Value"], self.unit)
+        value_text = f"{value:.1f}" if self.unit == "mmol/L" else f"{value:.0f}"
+        arrow = TREND_ARROWS.get(result.get("TrendArrow"), "")
+        print(f"{label}{format_time(result['Timestamp'])} {value_text} {self.unit} {arrow}")
+
+    def run(self):
+        while not self._stop.is_set():
+            wait = self.scheduler.seconds_until_next()
+            if wait > 0:
+                # Wake at least once a minute so clock jumps (sleep, NTP) are noticed
+                self._stop.wait(min(wait, 60))
+                continue
+            self.poll_once()
+
+    def stop(self):
+        self._stop.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--once", action="store_true", help="poll once and exit")
+    parser.add_argument("--all-patients", action="store_true", help="follow every connected patient")
+    parser.add_argument("--unit", choices=("mg/dL", "mmol/L"), help="display unit (default: from config)")
+    parser.add_argument("--api-port", type=int,
+                        help="serve readings on this local port (default: SCHUGAA_LOCAL_API_PORT or config)")
+    parser.add_argument("--api-host", default="127.0.0.1", help="address for the local API")
+    args = parser.parse_args()
+
+    config = load_daemon_config()
+    if not config.get("email") or not config.get("password"):
+        print("No credentials found. Run the app once, use setup_creds.py, "
+              "or set SCHUGAA_EMAIL and SCHUGAA_PASSWORD.", file=sys.stderr)
+        return 1
+
+    client = LibreClient(config["email"], config["password"], config.get("region", "eu"))
+    daemon = GlucoseDaemon(client, all_patients=args.all_patients,
+                           unit=args.unit or config.get("unit", "mg/dL"))
+
+    if args.once:
+        return 0 if daemon.poll_once() else 1
+
+    client.start_token_refresher()
+    api_port = args.api_port if args.api_port is not None else configured_port(config)
+    api = None
+    if api_port:
+        daemon.seed_from_store()
+        api = start_local_api(daemon.state, api_port, args.api_host)
+
+    def handle_signal(signum, frame):
+        print(f"Received signal {signum}, stopping")
+        daemon.stop()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    print(f"--- Schugaa daemon started: {time.ctime()} ---")
+    daemon.run()
+    if api:
+        api.stop()
+    client.stop_token_refresher()
+    if client.store is not None:
+        client.store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""Export stored readings to CSV, newline-delimited JSON or Parquet.
+
+    python export.py history.csv
+    python export.py --format ndjson --from 2026-01-01 --to 2026-02-01 - > january.ndjson
+    python export.py --format parquet history.parquet      (needs pyarrow)
+
+Readings are read from ~/.schugaa/readings.db and written chunk by chunk,
+so memory use doesn't depend on the length of the range.
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from datetime import datetime
+
+from reading_store import ReadingStore
+from readings import MMOL_FACTOR
+
+FORMATS = ("csv", "ndjson", "parquet")
+COLUMNS = ("timestamp", "local_time", "mg_dl", "mmol_l", "trend")
+CHUNK_SIZE = 10000
+
+
+def _local_time(ts):
+    return time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(ts))
+
+
+def _rows(chunk):
+    return [(ts, _local_time(ts), value, round(value / MMOL_FACTOR, 2), trend) for ts, value, trend in chunk]
+
+
+def _get_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except Exception:
+        return None
+
+
+class CSVWriter:
+    def __init__(self, out):
+        self.writer = csv.writer(out, lineterminator="\n")
+        self.writer.writerow(COLUMNS)
+
+    def write(self, chunk):
+        self.writer.writerows(_rows(chunk))
+
+    def close(self):
+        pass
+
+
+class NDJSONWriter:
+    def __init__(self, out):
+        self.out = out
+
+    def write(self, chunk):
+        # Every field is a number, null or a plain ASCII timestamp, so no json.dumps per row
+        self.out.write("".join(
+            f'{{"timestamp":{ts},"local_time":"{local}","mg_dl":{mg_dl!r},"mmol_l":{mmol_l!r},'
+            f'"trend":{"null" if trend is None else trend}}}\n'
+            for ts, local, mg_dl, mmol_l, trend in _rows(chunk)
+        ))
+
+    def close(self):
+        pass
+
+
+class ParquetWriter:
+    def __init__(self, path):
+        pa = _get_pyarrow()
+        if pa is None:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+        self.pa = pa
+        self.schema = pa.schema([
+            ("timestamp", pa.int64()),
+            ("local_time", pa.string()),
+            ("mg_dl", pa.float64()),
+            ("mmol_l", pa.float64()),
+            ("trend", pa.int8()),
+        ])
+        self.writer = pa.parquet.ParquetWriter(path, self.schema)
+
+    def write(self, chunk):
+        rows = _rows(chunk)
+        columns = [list(column) for column in zip(*rows)]
+        self.writer.write_table(self.pa.Table.from_arrays(
+            [self.pa.array(column, type=field.type) for column, field in zip(columns, self.schema)],
+            schema=self.schema,
+        ))
+
+    def close(self):
+        self.writer.close()
+
+
+def export_readings(store, out, fmt="csv", start=None, end=None, patient_id=None, chunk_size=CHUNK_SIZE):
+    """Write readings with start <= ts <= end to `out` and return how many were written.
+
+    `out` is a text stream for csv/ndjson and a path for parquet. Without a
+    patient_id, the patient with the most recent reading is exported.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if patient_id is None:
+        patient_id = store.latest_patient_id() or ""
+
+    if fmt == "csv":
+        writer = CSVWriter(out)
+    elif fmt == "ndjson":
+        writer = NDJSONWriter(out)
+    else:
+        writer = ParquetWriter(out)
+
+    written = 0
+    try:
+        for chunk in store.iter_range(start, end, patient_id, chunk_size):
+            writer.write(chunk)
+            written += len(chunk)
+    finally:
+        writer.close()
+    return written
+
+
+def _parse_time(value):
+    """Epoch seconds, or an ISO date/time in local time."""
+    try:
+        return int(value)
+    except ValueError:
+        return int(datetime.fromisoformat(value).timestamp())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("output", help="output file, or - for stdout (csv/ndjson only)")
+    parser.add_argument("--format", choices=FORMATS,
+                        help="default: from the output file's extension, else csv")
+    parser.add_argument("--from", dest="start", type=_parse_time, help="epoch seconds or ISO date, local time")
+    parser.add_argument("--to", dest="end", type=_parse_time, help="epoch seconds or ISO date, local time")
+    parser.add_argument("--patient", help="patient id (default: the most recently updated one)")
+    parser.add_argument("--db", help="readings database (default: ~/.schugaa/readings.db)")
+    args = parser.parse_args()
+
+    fmt = args.format
+    if fmt is None:
+        extension = os.path.splitext(args.output)[1].lstrip(".").lower()
+        fmt = {"jsonl": "ndjson", "json": "ndjson"}.get(extension, extension)
+        if fmt not in FORMATS:
+            fmt = "csv"
+    if fmt == "parquet" and args.output == "-":
+        parser.error("parquet can't be written to stdout")
+
+    store = ReadingStore(args.db)
+    started = time.perf_counter()
+    try:
+        if fmt == "parquet":
+            count = export_readings(store, args.output, fmt, args.start, args.end, args.patient)
+        elif args.output == "-":
+            count = export_readings(store, sys.stdout, fmt, args.start, args.end, args.patient)
+        else:
+            with open(args.output, "w", newline="", encoding="utf-8") as out:
+                count = export_readings(store, out, fmt, args.start, args.end, args.patient)
+    except Exception as e:
+        print(f"Failed to export readings: {e}", file=sys.stderr)
+        return 1
+    finally:
+        store.close()
+
+    print(f"Exported {count} readings in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+import threading
+from concurrent.futures import Future
+
+
+class FetchWorker:
+    """One long-lived thread that runs fetches one at a time.
+
+    request() returns a Future for the fetch the caller will be served by. If
+    a fetch is already running, or queued and not yet started, the caller
+    joins it instead of starting another, so concurrent refreshes (menu open,
+    timer, Refresh Now) collapse into a single call on the shared client and
+    all of them receive its result.
+    """
+
+    def __init__(self, fetch, name="schugaa-fetch"):
+        self._fetch = fetch
+        self._cond = threading.Condition()
+        self._pending = None
+        self._in_flight = None
+        self._stopped = False
+        self.fetch_count = 0
+        self.coalesced_count = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def request(self):
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("FetchWorker has been stopped")
+            if self._in_flight is not None:
+                self.coalesced_count += 1
+                return self._in_flight
+            if self._pending is not None:
+                self.coalesced_count += 1
+                return self._pending
+            self._pending = Future()
+            self._cond.notify()
+            return self._pending
+
+    def is_busy(self):
+        with self._cond:
+            return self._in_flight is not None or self._pending is not None
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    if self._pending is not None:
+                        self._pending.cancel()
+                    return
+                future = self._pending
+                self._pending = None
+                self._in_flight = future
+
+            try:
+                if future.set_running_or_notify_cancel():
+                    self.fetch_count += 1
+                    try:
+                        future.set_result(self._fetch())
+                    except BaseException as e:
+                        future.set_exception(e)
+            finally:
+                with self._cond:
+                    self._in_flight = None
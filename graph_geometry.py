@@ -0,0 +1,185 @@
+from bisect import bisect_left
+
+from readings import format_time, MMOL_FACTOR
+
+MARGIN_LEFT = 45
+MARGIN_RIGHT = 20
+MARGIN_TOP = 20
+MARGIN_BOTTOM = 75
+
+HOUR_DOT_SPACING = 3300
+
+
+def glucose_color_name(value):
+    """Colour bucket for a mg/dL value; the view maps names to NSColors."""
+    if value < 70:
+        return "red"
+    elif 70 <= value <= 79:
+        return "yellow"
+    elif 80 <= value <= 180:
+        return "green"
+    elif 181 <= value <= 220:
+        return "yellow"
+    elif 221 <= value <= 250:
+        return "orange"
+    else:
+        return "red"
+
+
+def calculate_stats(values):
+    if not values:
+        return {"low": 0, "in_range": 0, "high": 0}
+
+    total = len(values)
+    low_count = 0
+    in_range_count = 0
+    high_count = 0
+
+    for val in values:
+        if val < 70:
+            low_count += 1
+        elif val > 200:
+            high_count += 1
+        else:
+            in_range_count += 1
+
+    return {
+        "low": int((low_count / total) * 100),
+        "in_range": int((in_range_count / total) * 100),
+        "high": int((high_count / total) * 100)
+    }
+
+
+def select_hour_dots(times):
+    """Indices of points to mark with a dot: the newest, then one roughly every hour back."""
+    if not times:
+        return []
+
+    last = len(times) - 1
+    dots = [last]
+    last_dot_time = times[last]
+    for i in range(last - 1, -1, -1):
+        if last_dot_time - times[i] >= HOUR_DOT_SPACING:
+            dots.append(i)
+            last_dot_time = times[i]
+    return dots
+
+
+def nearest_index(xs, x):
+    """Index of the value in the sorted list xs closest to x, or None if xs is empty."""
+    if not xs:
+        return None
+    i = bisect_left(xs, x)
+    if i == 0:
+        return 0
+    if i == len(xs):
+        return len(xs) - 1
+    return i if xs[i] - x < x - xs[i - 1] else i - 1
+
+
+class GraphGeometry:
+    """Everything drawRect_ needs, in view coordinates, with no AppKit types."""
+
+    __slots__ = ("width", "height", "plot_width", "plot_height", "band", "limit_lines",
+                 "grid_lines", "points", "xs", "hour_dots", "x_ticks", "stats", "stat_boxes")
+
+
+def compute_geometry(series, width, height, unit="mg/dL"):
+    """Lay out the glucose graph for a ReadingSeries in a width x height view.
+
+    Pure and deterministic, so the result can be cached and reused for every
+    redraw until the data, size or unit changes.
+    """
+    geo = GraphGeometry()
+    geo.width = width
+    geo.height = height
+
+    is_mmol = unit == "mmol/L"
+    factor = MMOL_FACTOR if is_mmol else 1.0
+
+    if is_mmol:
+        max_y_val = 21.0
+        min_y_val = 0.0
+        grid_values = [3, 6, 9, 12, 15, 18, 21]
+        val_70 = 3.9
+        val_180 = 10.0
+        val_250 = 13.9
+    else:
+        max_y_val = 300
+        min_y_val = 50
+        grid_values = [50, 100, 150, 200, 250, 300]
+        val_70 = 70
+        val_180 = 180
+        val_250 = 250
+
+    y_range = max_y_val - min_y_val
+
+    plot_width = width - MARGIN_LEFT - MARGIN_RIGHT
+    plot_height = height - MARGIN_BOTTOM - MARGIN_TOP
+    geo.plot_width = plot_width
+    geo.plot_height = plot_height
+
+    def get_y(val):
+        val_clamped = max(min(val, max_y_val), min_y_val)
+        normalized = (val_clamped - min_y_val) / y_range
+        return MARGIN_BOTTOM + normalized * plot_height
+
+    y_low = get_y(val_70)
+    y_high = get_y(val_180)
+    geo.band = (MARGIN_LEFT, y_low, plot_width, y_high - y_low) if y_high > y_low else None
+
+    y_limit_high = get_y(val_250)
+    geo.limit_lines = [
+        ((MARGIN_LEFT, y_low), (width - MARGIN_RIGHT, y_low)),
+        ((MARGIN_LEFT, y_limit_high), (width - MARGIN_RIGHT, y_limit_high)),
+    ]
+
+    geo.grid_lines = []
+    for val in grid_values:
+        y = get_y(val)
+        if y >= MARGIN_BOTTOM and y <= height - MARGIN_TOP:
+            geo.grid_lines.append((y, str(val)))
+
+    count = len(series)
+    step = plot_width / max(count - 1, 1) if count > 1 else 0
+    times = series.times
+    values = series.values
+
+    geo.points = []
+    geo.xs = []
+    for i in range(count):
+        val = values[i]
+        disp_val = val / factor
+        x = MARGIN_LEFT + i * step
+        geo.points.append((x, get_y(disp_val), disp_val, times[i], val))
+        geo.xs.append(x)
+
+    geo.hour_dots = []
+    for i in select_hour_dots(times):
+        x, y, _, _, raw_val = geo.points[i]
+        geo.hour_dots.append((x, y, glucose_color_name(raw_val)))
+
+    geo.x_ticks = []
+    if count:
+        for idx in (0, count // 2, count - 1):
+            try:
+                geo.x_ticks.append((geo.points[idx][0], format_time(times[idx], "%H")))
+            except Exception:
+                pass
+
+    geo.stats = calculate_stats(values)
+
+    box_height = 34
+    box_y = 5
+    b_margin_left = MARGIN_LEFT + 40
+    b_margin_right = MARGIN_RIGHT + 40
+    avail_width = width - b_margin_left - b_margin_right
+    gap = 25
+    box_width = (avail_width - (2 * gap)) / 3
+
+    geo.stat_boxes = []
+    for i, (key, label) in enumerate((("high", "High"), ("in_range", "In Range"), ("low", "Low"))):
+        bx = b_margin_left + i * (box_width + gap)
+        geo.stat_boxes.append((key, label, geo.stats.get(key, 0), (bx, box_y, box_width, box_height)))
+
+    return geo
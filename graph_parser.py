@@ -0,0 +1,200 @@
+import calendar
+import os
+from datetime import datetime
+from functools import lru_cache
+
+from pylibrelinkup.exceptions import PatientNotFoundError
+from pylibrelinkup.models.connection import GraphResponse
+
+from readings import ReadingSeries
+
+# Set SCHUGAA_STRICT_PARSE=1 to validate every graph response with the
+# library's pydantic models instead of the fast parser (useful when Abbott
+# changes the payload and something looks off).
+STRICT_ENV = "SCHUGAA_STRICT_PARSE"
+
+SENSOR_EXPIRE_KEYS = (
+    "e",
+    "exp",
+    "expires",
+    "expiration",
+    "sensorExpires",
+    "sensorExpiration",
+    "end",
+    "endDate",
+    "endTime",
+)
+
+
+def strict_parsing_enabled():
+    return os.environ.get(STRICT_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+class ParsedGraph:
+    """What a poll needs from a graph response, with timestamps as epoch seconds.
+
+    current is (ts, value) or None during signal loss; history is oldest first.
+    sensor_* fields are the raw values from the payload, before the client
+    applies its sensor registry.
+    """
+
+    __slots__ = ("connection_status", "current", "trend", "history",
+                 "sensor_serial", "sensor_activated", "sensor_expires")
+
+    def __init__(self, connection_status=None, current=None, trend=None, history=None,
+                 sensor_serial=None, sensor_activated=None, sensor_expires=None):
+        self.connection_status = connection_status
+        self.current = current
+        self.trend = trend
+        self.history = history if history is not None else ReadingSeries()
+        self.sensor_serial = sensor_serial
+        self.sensor_activated = sensor_activated
+        self.sensor_expires = sensor_expires
+
+
+@lru_cache(maxsize=256)
+def _day_start(date_part):
+    month, day, year = date_part.split("/")
+    return calendar.timegm((int(year), int(month), int(day), 0, 0, 0))
+
+
+def parse_factory_timestamp(value):
+    """Epoch seconds for a FactoryTimestamp like "1/31/2025 10:04:05 PM" (UTC)."""
+    date_part, time_part, meridiem = value.split(" ")
+    hour, minute, second = time_part.split(":")
+    hour = int(hour) % 12
+    if meridiem == "PM":
+        hour += 12
+    return _day_start(date_part) + hour * 3600 + int(minute) * 60 + int(second)
+
+
+def normalize_timestamp(ts):
+    """Epoch seconds from an int/float (seconds or milliseconds), digit string or ISO string."""
+    if ts is None:
+        return None
+    if isinstance(ts, str):
+        ts_str = ts.strip()
+        if ts_str.isdigit():
+            ts = int(ts_str)
+        else:
+            try:
+                if ts_str.endswith("Z"):
+                    ts_str = ts_str[:-1] + "+00:00"
+                return int(datetime.fromisoformat(ts_str).timestamp())
+            except Exception:
+                return None
+
+    try:
+        ts_val = float(ts)
+    except Exception:
+        return None
+
+    if ts_val > 1e11:
+        ts_val = ts_val / 1000.0
+
+    return int(ts_val)
+
+
+def _sensor_expiry(sensor):
+    for key in SENSOR_EXPIRE_KEYS:
+        if key in sensor:
+            expires = normalize_timestamp(sensor.get(key))
+            if expires:
+                return expires
+    return None
+
+
+def extract_sensor_info(data):
+    """(serial, activated, expires) from a graph response's data section."""
+    connection = data.get("connection") or {}
+    sensor = connection.get("sensor") or {}
+
+    activated = normalize_timestamp(sensor.get("a"))
+    serial = sensor.get("sn")
+    expires = _sensor_expiry(sensor)
+
+    if not activated or not expires or not serial:
+        for item in data.get("activeSensors") or []:
+            s = (item or {}).get("sensor") or {}
+            if not activated:
+                activated = normalize_timestamp(s.get("a"))
+            if not serial:
+                serial = s.get("sn")
+            if not expires:
+                expires = _sensor_expiry(s)
+            if activated and serial:
+                break
+
+    return serial or None, activated, expires
+
+
+def parse_graph(graph_response):
+    """Single pass over a raw graph response; no pydantic models are built.
+
+    Missing or null glucoseMeasurement (signal loss), or one without a Value,
+    gives current=None rather than an error. History entries that can't be
+    read, including ones without a Value, are skipped rather than stored as 0.
+    """
+    response = graph_response if isinstance(graph_response, dict) else {}
+    data = response.get("data")
+    if not isinstance(data, dict):
+        if response.get("status") == 4:
+            raise PatientNotFoundError()
+        return ParsedGraph()
+
+    connection = data.get("connection") or {}
+    parsed = ParsedGraph(connection_status=connection.get("status"))
+
+    measurement = connection.get("glucoseMeasurement")
+    if measurement:
+        try:
+            parsed.current = (parse_factory_timestamp(measurement["FactoryTimestamp"]),
+                              float(measurement["Value"]))
+            parsed.trend = int(measurement.get("TrendArrow", 3))
+        except (KeyError, TypeError, ValueError):
+            parsed.current = None
+            parsed.trend = None
+
+    history = parsed.history
+    times = history.times
+    values = history.values
+    for item in data.get("graphData") or ():
+        try:
+            ts = parse_factory_timestamp(item["FactoryTimestamp"])
+            value = float(item["Value"])
+        except (KeyError, TypeError, ValueError, AttributeError):
+            continue
+        times.append(ts)
+        values.append(value)
+
+    try:
+        parsed.sensor_serial, parsed.sensor_activated, parsed.sensor_expires = extract_sensor_info(data)
+    except Exception:
+        pass
+    return parsed
+
+
+def parse_graph_strict(graph_response):
+    """Validate with pylibrelinkup's GraphResponse, then convert to a ParsedGraph.
+
+    Raises pydantic's ValidationError when the payload doesn't match the models
+    (which includes signal loss, where glucoseMeasurement is null).
+    """
+    graph_obj = GraphResponse.model_validate(graph_response)
+    connection = graph_obj.data.connection
+    latest = graph_obj.current
+
+    history = ReadingSeries()
+    for h in graph_obj.history or []:
+        history.append(int(h.factory_timestamp.timestamp()), h.value)
+
+    serial, activated, expires = extract_sensor_info(graph_response["data"])
+    return ParsedGraph(
+        connection_status=connection.status,
+        current=(int(latest.factory_timestamp.timestamp()), latest.value) if latest else None,
+        trend=latest.trend.value if latest else None,
+        history=history,
+        sensor_serial=serial,
+        sensor_activated=activated,
+        sensor_expires=expires,
+    )
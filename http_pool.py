@@ -0,0 +1,75 @@
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# (connect, read) seconds
+DEFAULT_TIMEOUT = (5, 20)
+
+
+class SessionPool:
+    """Long-lived keep-alive HTTP sessions, one per API base URL.
+
+    Reusing a session keeps the TCP/TLS connection to the regional LibreLinkUp
+    host open between polls, so only the first request pays the handshake.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, pool_maxsize=4):
+        self.timeout = timeout
+        self.pool_maxsize = pool_maxsize
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _base_url(self, url):
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def session_for(self, url):
+        base_url = self._base_url(url)
+        with self._lock:
+            session = self._sessions.get(base_url)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[base_url] = session
+            return session
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session_for(url).request(method, url, **kwargs)
+
+    def stats(self):
+        """Connection reuse across all sessions, from urllib3's pool counters."""
+        total_requests = 0
+        new_connections = 0
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            for adapter in set(session.adapters.values()):
+                pools = getattr(getattr(adapter, "poolmanager", None), "pools", None)
+                if pools is None:
+                    continue
+                for key in list(pools.keys()):
+                    pool = pools.get(key)
+                    if pool is None:
+                        continue
+                    total_requests += getattr(pool, "num_requests", 0)
+                    new_connections += getattr(pool, "num_connections", 0)
+
+        reused = max(total_requests - new_connections, 0)
+        return {
+            "requests": total_requests,
+            "new_connections": new_connections,
+            "reused_connections": reused,
+            "reuse_ratio": (reused / total_requests) if total_requests else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions = {}
+        for session in sessions:
+            session.close()
@@ -1,12 +1,122 @@
 
+import base64
 import json
 import time
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pylibrelinkup.pylibrelinkup import PyLibreLinkUp
 from pylibrelinkup.api_url import APIUrl
-from pylibrelinkup.exceptions import AuthenticationError, RedirectError
+from pylibrelinkup.exceptions import (AuthenticationError, RedirectError, PatientNotFoundError,
+                                      TermsOfUseError, PrivacyPolicyError, EmailVerificationError,
+                                      LLUAPIRateLimitError)
+from pylibrelinkup.models.login import LoginResponse
 from pydantic import ValidationError
 from datetime import datetime
+import metrics
+import persistence
+import profiling
+from reading_store import ReadingStore
+from readings import ReadingSeries
+from http_pool import SessionPool
+from graph_parser import (parse_graph, parse_graph_strict, extract_sensor_info, normalize_timestamp,
+                          strict_parsing_enabled)
+from rate_limit import RequestGovernor, RateLimitCooldown, parse_retry_after, retry_delay
+
+LOGIN_SECONDS = metrics.histogram("login_seconds", "LibreLinkUp login round trip")
+PATIENTS_SECONDS = metrics.histogram("patients_seconds", "LibreLinkUp connections request")
+GRAPH_SECONDS = metrics.histogram("graph_seconds", "LibreLinkUp graph request")
+PARSE_SECONDS = metrics.histogram("parse_seconds", "Parsing one graph response")
+REQUESTS = metrics.counter("upstream_requests_total", "Requests sent to LibreLinkUp")
+RATE_LIMITED = metrics.counter("rate_limited_total", "429 responses from LibreLinkUp")
+LOGINS = metrics.counter("logins_total", "Successful logins")
+RELOGINS = metrics.counter("relogins_total", "Logins that replaced an existing token")
+REDIRECTS = metrics.counter("redirects_total", "Region redirects received at login")
+SIGNAL_LOSS = metrics.counter("signal_loss_total", "Graph responses without a current reading")
+
+def token_expiry(token):
+    """Epoch seconds from a JWT's exp claim, or None if the token doesn't carry one."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+        return int(exp) if exp else None
+    except Exception:
+        return None
+
+class PooledLibreLinkUp(PyLibreLinkUp):
+    """PyLibreLinkUp that sends login, connections and graph calls over a shared SessionPool.
+
+    Every request also goes through the RequestGovernor, so all three kinds of
+    call share one rate-limit budget and cooldown.
+    """
+
+    def __init__(self, email, password, api_url=APIUrl.US, session_pool=None, governor=None):
+        super().__init__(email, password, api_url=api_url if isinstance(api_url, APIUrl) else APIUrl.US)
+        if not isinstance(api_url, APIUrl):
+            # A plain base URL, e.g. a local stand-in server
+            self.api_url = api_url
+        self.session_pool = session_pool or SessionPool()
+        self.governor = governor or RequestGovernor()
+        # authTicket.expires from the last login, epoch seconds
+        self.token_expires = None
+
+    def _request(self, method, url, **kwargs):
+        self.governor.before_request()
+        REQUESTS.inc()
+        r = self.session_pool.request(method, url, **kwargs)
+        retry_after = r.headers.get("Retry-After")
+        self.governor.record_response(r.status_code, retry_after)
+        if r.status_code == 429:
+            RATE_LIMITED.inc()
+            raise LLUAPIRateLimitError(
+                response_code=r.status_code,
+                message="Too many requests. Please try again later.",
+                retry_after=parse_retry_after(retry_after),
+            )
+        r.raise_for_status()
+        return r
+
+    def _call_api(self, url):
+        r = self._request("GET", url, headers=self._get_headers())
+        return r.json()
+
+    def authenticate(self):
+        with LOGIN_SECONDS.time():
+            self._authenticate()
+
+    def _authenticate(self):
+        r = self._request(
+            "POST",
+            f"{self.api_url}/llu/auth/login",
+            headers=self._get_headers(),
+            json=self.login_args.model_dump(),
+        )
+        data = r.json()
+
+        data_dict = data.get("data", {}) or {}
+        if data_dict.get("redirect", False):
+            raise RedirectError(APIUrl.from_string(data_dict["region"].upper()))
+
+        step = (data_dict.get("step") or {}).get("type")
+        if step == "tou":
+            raise TermsOfUseError()
+        if step == "pp":
+            raise PrivacyPolicyError()
+        if step == "verifyEmail":
+            raise EmailVerificationError()
+
+        try:
+            login_response = LoginResponse.model_validate(data)
+        except ValidationError:
+            raise AuthenticationError("Invalid login credentials")
+        ticket = login_response.data.authTicket
+        self._set_token(ticket.token)
+        expires = ticket.expires
+        if expires > 10 ** 12:
+            expires //= 1000
+        self.token_expires = expires or None
+        self._set_account_id_hash(login_response.data.user.id)
 
 class LibreClient:
     REGIONS = {
@@ -29,24 +139,104 @@ class LibreClient:
         "kr": APIUrl.AP
     }
 
-    def __init__(self, email, password, region="eu"):
+    # The connection list rarely changes, so it is only re-fetched after this
+    # long or when an auth error, redirect or 404 suggests it is stale.
+    PATIENTS_TTL = 60 * 60
+
+    # Log in again this long before the token expires, in the background
+    REFRESH_AHEAD = 10 * 60
+    # Used only when neither the auth ticket nor the token says when it expires
+    FALLBACK_TOKEN_LIFETIME = 60 * 60
+    # Login requests per login() (redirects included), the waits between them
+    # (seconds), and the waits between failed background refreshes
+    LOGIN_ATTEMPTS = 3
+    LOGIN_RETRY_BASE = 2
+    LOGIN_RETRY_MAX = 10
+    REFRESH_RETRY_BASE = 60
+    REFRESH_RETRY_MAX = 15 * 60
+    # With more followed patients than the governor's burst capacity, per-patient
+    # graph calls wait this long for budget instead of failing
+    FANOUT_MAX_WAIT = 60
+
+    def __init__(self, email, password, region="eu", session_pool=None, timeout=None, governor=None,
+                 strict_parsing=None, api_url=None):
         self.email = email
         self.password = password
         self.region = region
-        self.api_url = self.REGIONS.get(region, APIUrl.US)
+        # Point the client somewhere other than Abbott (e.g. bench/fake_server.py).
+        # "{region}" is replaced with the region's name, so redirects keep working.
+        self.api_url_override = api_url or os.environ.get("SCHUGAA_API_URL") or None
+        self.api_url = self._region_url(self.REGIONS.get(region, APIUrl.US))
         self.last_error = None
+        # Full pydantic validation of graph responses; off unless asked for
+        self.strict_parsing = strict_parsing_enabled() if strict_parsing is None else strict_parsing
         
         import pylibrelinkup.pylibrelinkup
         pylibrelinkup.pylibrelinkup.HEADERS["User-Agent"] = "LibreLinkUp/4.16.0 (com.abbott.librelinkup; build:4.16.0; Android 14; 34) OkHttp/4.12.0"
         
-        self.client = PyLibreLinkUp(email, password, api_url=self.api_url)
+        if session_pool is None:
+            session_pool = SessionPool(timeout=timeout) if timeout else SessionPool()
+        self.session_pool = session_pool
+        self.governor = governor or RequestGovernor()
+        self.client = PooledLibreLinkUp(email, password, api_url=self.api_url,
+                                         session_pool=session_pool, governor=self.governor)
         
         self.expiry = 0
         self.session_file = "session.json"
+        # First connection, the one shown in the menu bar; kept in the session file
+        self.followed_patient_id = None
         self.sensor_history_file = "sensors.json"
         
         self._load_session()
         self.sensor_history = self._load_sensor_history()
+        self.store = self._open_reading_store()
+        # Last seen history FactoryTimestamp (epoch seconds) per patient
+        self.high_water_marks = {}
+        self._patients = None
+        self._patients_fetched_at = 0
+        self._sensor_lock = threading.Lock()
+        self._login_lock = threading.Lock()
+        self._login_generation = 0
+        self._refresher = None
+        self._refresher_stop = threading.Event()
+
+    def _open_reading_store(self):
+        try:
+            return ReadingStore()
+        except Exception as e:
+            print(f"Failed to open reading store: {e}")
+        return None
+
+    def _store_readings(self, patient_id, series, current=None, trend=None):
+        if not self.store:
+            return
+        try:
+            readings = [(ts, value, None) for ts, value in series]
+            if current:
+                readings.append((current[0], current[1], trend))
+            added = self.store.add_readings(readings, patient_id=str(patient_id))
+            if added:
+                print(f"Stored {added} new readings")
+        except Exception as e:
+            print(f"Failed to store readings: {e}")
+
+    def get_cached_glucose(self, hours=12):
+        """Build a GraphData-only result from the local store, without any network calls."""
+        if not self.store:
+            return None
+        try:
+            patient_id = self.followed_patient_id or self.store.latest_patient_id()
+            if patient_id is None:
+                return None
+            since = int(time.time()) - hours * 60 * 60
+            rows = self.store.get_range(start=since, patient_id=patient_id)
+        except Exception as e:
+            print(f"Failed to read cached readings: {e}")
+            return None
+        if not rows:
+            return None
+
+        return {"GraphData": ReadingSeries.from_pairs((ts, value) for ts, value, _ in rows)}
 
     def _get_sensor_history_path(self):
         home = os.path.expanduser("~")
@@ -68,12 +258,7 @@ class LibreClient:
     def _save_sensor_history(self):
         try:
             path = self._get_sensor_history_path()
-            with open(path, 'w') as f:
-                json.dump(self.sensor_history, f, indent=2)
-            try:
-                os.chmod(path, 0o600)
-            except Exception:
-                pass
+            persistence.write_json(path, self.sensor_history, indent=2)
         except Exception as e:
             print(f"Failed to save sensor history: {e}")
 
@@ -81,7 +266,11 @@ class LibreClient:
         """Get stored activation time for sensor, or register new sensor with current time."""
         if not serial_number:
             return api_activation_time
-            
+
+        with self._sensor_lock:
+            return self._get_or_register_sensor_locked(serial_number, api_activation_time)
+
+    def _get_or_register_sensor_locked(self, serial_number, api_activation_time):
         if serial_number in self.sensor_history:
             stored = self.sensor_history[serial_number]
             print(f"Found stored sensor {serial_number}, first seen: {stored.get('first_seen')}")
@@ -100,84 +289,16 @@ class LibreClient:
 
 
     def _normalize_timestamp(self, ts):
-        if ts is None:
-            return None
-        if isinstance(ts, str):
-            ts_str = ts.strip()
-            if ts_str.isdigit():
-                try:
-                    ts = int(ts_str)
-                except Exception:
-                    return None
-            else:
-                try:
-                    if ts_str.endswith("Z"):
-                        ts_str = ts_str[:-1] + "+00:00"
-                    dt = datetime.fromisoformat(ts_str)
-                    return int(dt.timestamp())
-                except Exception:
-                    return None
-
-        try:
-            ts_val = float(ts)
-        except Exception:
-            return None
-
-        if ts_val > 1e11:
-            ts_val = ts_val / 1000.0
-
-        return int(ts_val)
+        return normalize_timestamp(ts)
 
     def _extract_sensor_times(self, graph_response):
-        sensor_activated = None
-        sensor_expires = None
-        sensor_serial = None
-
-        expire_keys = (
-            "e",
-            "exp",
-            "expires",
-            "expiration",
-            "sensorExpires",
-            "sensorExpiration",
-            "end",
-            "endDate",
-            "endTime",
-        )
-
         try:
-            data = (graph_response or {}).get("data") or {}
-            connection = data.get("connection") or {}
-            sensor = connection.get("sensor") or {}
-
-            sensor_activated = self._normalize_timestamp(sensor.get("a"))
-            sensor_serial = sensor.get("sn")
-
-            for key in expire_keys:
-                if key in sensor:
-                    sensor_expires = self._normalize_timestamp(sensor.get(key))
-                    if sensor_expires:
-                        break
-
-            if not sensor_activated or not sensor_expires or not sensor_serial:
-                active_sensors = data.get("activeSensors") or []
-                for item in active_sensors:
-                    s = (item or {}).get("sensor") or {}
-                    if not sensor_activated:
-                        sensor_activated = self._normalize_timestamp(s.get("a"))
-                    if not sensor_serial:
-                        sensor_serial = s.get("sn")
-                    if not sensor_expires:
-                        for key in expire_keys:
-                            if key in s:
-                                sensor_expires = self._normalize_timestamp(s.get(key))
-                                if sensor_expires:
-                                    break
-                    if sensor_activated and sensor_serial:
-                        break
+            serial, activated, expires = extract_sensor_info((graph_response or {}).get("data") or {})
         except Exception:
-            pass
+            serial, activated, expires = None, None, None
+        return self._resolve_sensor_times(serial, activated, expires)
 
+    def _resolve_sensor_times(self, sensor_serial, sensor_activated, sensor_expires):
         # Use stored activation time if we have the serial number
         if sensor_serial:
             stored_activation = self._get_or_register_sensor(sensor_serial, sensor_activated)
@@ -190,17 +311,10 @@ class LibreClient:
 
         return sensor_activated, sensor_expires
 
-
-
-    def _infer_sensor_duration_seconds(self, sensor):
-        duration_days = 14
-        try:
-            if sensor and sensor.sn and len(sensor.sn) >= 10:
-                duration_days = 15
-        except Exception:
-            pass
-
-        return duration_days * 24 * 60 * 60
+    def _region_url(self, url_enum):
+        if not self.api_url_override:
+            return url_enum
+        return self.api_url_override.format(region=url_enum.name.lower())
 
     def _coerce_api_url(self, value):
         if isinstance(value, APIUrl):
@@ -227,15 +341,10 @@ class LibreClient:
                 "account_id_hash": self.client.account_id_hash,
                 "region": self.region,
                 "api_url": self.client.api_url.value if hasattr(self.client.api_url, "value") else self.client.api_url,
-                "expiry": self.expiry 
+                "expiry": self.expiry,
+                "patient_id": self.followed_patient_id,
             }
-            path = self._get_session_path()
-            with open(path, 'w') as f:
-                json.dump(data, f)
-            try:
-                os.chmod(path, 0o600)
-            except Exception:
-                pass
+            persistence.write_json(self._get_session_path(), data)
         except Exception as e:
             print(f"Failed to save session: {e}")
 
@@ -247,9 +356,16 @@ class LibreClient:
                     data = json.load(f)
                     
                 
-                if data.get("expiry") and time.time() < (data["expiry"] - 600):
-                    if data.get("token"):
-                        self.client._set_token(data["token"])
+                expiry = token_expiry(data.get("token", "")) or data.get("expiry")
+                if self.api_url_override:
+                    # Don't reuse a token issued by a different server
+                    prefix = self.api_url_override.split("{", 1)[0]
+                    if not str(data.get("api_url", "")).startswith(prefix):
+                        return
+                # Still valid once the token has expired: it picks the cached history to show
+                self.followed_patient_id = data.get("patient_id")
+                if data.get("token") and expiry and time.time() < expiry:
+                    self.client._set_token(data["token"])
                     if data.get("account_id_hash"):
                         self.client.account_id_hash = data["account_id_hash"]
                     
@@ -258,207 +374,385 @@ class LibreClient:
                     if data.get("region"):
                         self.region = data["region"]
                         
-                    self.expiry = data.get("expiry")
-                    print("Session loaded from disk. Reusing token.")
+                    self.expiry = expiry
+                    print(f"Session loaded from disk. Reusing token until {datetime.fromtimestamp(expiry)}.")
         except Exception as e:
             print(f"Failed to load session: {e}")
 
-    def login(self):
-        max_retries = 3
-        base_delay = 5 
-        
-        for attempt in range(max_retries):
-            try:
-                print(f"Logging in to {self.client.api_url} (Attempt {attempt+1})")
-                self.client.authenticate()
-                
-                self.expiry = int(time.time()) + 3600 
-                self._save_session()
-                return True
-
-            except RedirectError as e:
-                print(f"Redirect received to: {e.region}")
-                if e.region == self.client.api_url:
-                     print("Redirect loop detected. Aborting.")
-                     return False
-                     
-                self.client.api_url = e.region.value 
-                for region_code, url_enum in self.REGIONS.items():
-                    if url_enum == e.region:
-                        self.region = region_code
-                        break
-                continue
+    def _get_patients(self):
+        now = time.time()
+        if self._patients and now - self._patients_fetched_at < self.PATIENTS_TTL:
+            return self._patients
+
+        with PATIENTS_SECONDS.time():
+            patients = self.client.get_patients()
+        self._patients = patients
+        self._patients_fetched_at = now
+        return patients
+
+    def _invalidate_patients(self):
+        self._patients = None
+        self._patients_fetched_at = 0
+
+    def connection_stats(self):
+        """How often LibreLinkUp requests reused an already-open connection."""
+        return self.session_pool.stats()
+
+    def _response_status(self, error):
+        response = getattr(error, "response", None)
+        return getattr(response, "status_code", None)
+
+    def _set_rate_limit_error(self, error):
+        retry_after = getattr(error, "retry_after", None) or self.governor.cooldown_remaining()
+        self.last_error = {
+            "type": "rate_limit",
+            "message": "Rate limit hit. Backing off and retrying.",
+            "retry_after": retry_after
+        }
+
+    def _on_authenticated(self):
+        expires = self.client.token_expires or token_expiry(self.client.token)
+        self.expiry = int(expires) if expires else int(time.time()) + self.FALLBACK_TOKEN_LIFETIME
+        self._login_generation += 1
+        LOGINS.inc()
+        self._save_session()
+
+    def _follow_redirect(self, e):
+        """Switch to the region a RedirectError points at; False if it points back at us."""
+        print(f"Redirect received to: {e.region}")
+        REDIRECTS.inc()
+        self._invalidate_patients()
+        target = self._region_url(e.region)
+        if target == self.client.api_url:
+             print("Redirect loop detected. Aborting.")
+             return False
+             
+        self.client.api_url = target.value if isinstance(target, APIUrl) else target
+        for region_code, url_enum in self.REGIONS.items():
+            if url_enum == e.region:
+                self.region = region_code
+                break
+        return True
 
-            except Exception as e:
-                print(f"Login error: {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(base_delay * (2 ** attempt))
-                    
+    def login(self):
+        generation = self._login_generation
+        for attempt in range(self.LOGIN_ATTEMPTS):
+            outcome = self.login_attempt(attempt, generation)
+            if outcome == "error" and attempt < self.LOGIN_ATTEMPTS - 1:
+                # Not under _login_lock, so the token refresher isn't held up meanwhile
+                time.sleep(self.login_retry_delay(attempt))
+            elif outcome != "redirected":
+                return outcome == "logged_in"
         return False
 
-    def get_latest_glucose(self, retry=True):
+    def login_retry_delay(self, attempt):
+        # Seconds, not the rate-limit backoff
+        return retry_delay(attempt, self.LOGIN_RETRY_BASE, self.LOGIN_RETRY_MAX)
+
+    def login_attempt(self, attempt, generation):
+        """One login request under _login_lock, shared by login() and AsyncLibreClient.
+
+        Returns "logged_in", "failed" (give up), "redirected" (try again now)
+        or "error" (try again after login_retry_delay()). `generation` is
+        _login_generation as the caller first saw it; if another login has
+        succeeded since, this one is skipped.
+        """
+        with self._login_lock:
+            # Another thread or coroutine (e.g. the token refresher) logged in meanwhile
+            if generation != self._login_generation and self.client.token:
+                return "logged_in"
+            replacing_token = bool(self.client.token)
+            # Governor updates from this login's responses and the new session are written once, at the end
+            with persistence.batched():
+                outcome = self._login_attempt_locked(attempt)
+            if outcome == "logged_in" and replacing_token:
+                RELOGINS.inc()
+            return outcome
+
+    def _login_attempt_locked(self, attempt):
+        self._invalidate_patients()
         try:
-            self.last_error = None
+            print(f"Logging in to {self.client.api_url} (Attempt {attempt+1})")
+            self.client.authenticate()
+            self._on_authenticated()
+            return "logged_in"
+
+        except RedirectError as e:
+            return "redirected" if self._follow_redirect(e) else "failed"
+
+        except (LLUAPIRateLimitError, RateLimitCooldown) as e:
+            # Retrying would only extend the cooldown; let the scheduler come back later
+            print(f"Login rate limited: {e}")
+            self._set_rate_limit_error(e)
+            return "failed"
+
+        except Exception as e:
+            print(f"Login error: {e}")
+            return "error"
+
+    def needs_refresh(self, now=None):
+        now = time.time() if now is None else now
+        return now >= self.expiry - self.REFRESH_AHEAD
+
+    def start_token_refresher(self):
+        """Re-login in a background thread shortly before the token expires,
+        so polls keep using a valid token instead of waiting on a login."""
+        if self._refresher is not None and self._refresher.is_alive():
+            return
+        self._refresher_stop.clear()
+        self._refresher = threading.Thread(target=self._refresh_loop, name="schugaa-token-refresh", daemon=True)
+        self._refresher.start()
+
+    def stop_token_refresher(self):
+        self._refresher_stop.set()
+
+    def _refresh_loop(self):
+        failures = 0
+        while not self._refresher_stop.is_set():
             if not self.client.token:
-                if not self.login():
-                   return None
-            
-            if time.time() > self.expiry:
-                print("Token likely expired. Relogging...")
-                if self.login():
-                    if retry:
-                        return self.get_latest_glucose(retry=False)
-                return None
+                # Nothing to refresh until a poll has logged in for the first time
+                self._refresher_stop.wait(60)
+                continue
 
-            try:
-                patients = self.client.get_patients()
-            except ValidationError as ve:
-                print(f"Data format error (likely redirect): {ve}. Relogging...")
-                if self.login():
-                    if retry:
-                        return self.get_latest_glucose(retry=False)
-                return None
-            
-            
-            if not patients:
-                print("No patients found.")
-                return None
-            
-            patient_id = patients[0].patient_id
-            
-            # Get graph data
-            graph_response = self.client._get_graph_data_json(patient_id)
-            
-            # Extract connection status from raw response
-            connection_status = None
-            try:
-                data_section = graph_response.get("data", {})
-                connection_section = data_section.get("connection", {})
-                connection_status = connection_section.get("status")
-            except Exception:
-                pass
-
-            from pylibrelinkup.models.connection import GraphResponse
-            try:
-                graph_obj = GraphResponse.model_validate(graph_response)
-            except ValidationError:
-                # API returned None for glucoseMeasurement/glucoseItem (signal loss)
-                # Return partial result with connection status
-                sensor_activated, sensor_expires = self._extract_sensor_times(graph_response)
-                result = {
-                    "Value": None,
-                    "TrendArrow": None,
-                    "Timestamp": None,
-                    "GraphData": [],
-                    "ConnectionStatus": connection_status
-                }
-                if sensor_activated:
-                    result["SensorActivated"] = sensor_activated
-                if sensor_expires:
-                    result["SensorExpires"] = sensor_expires
-                return result
+            wait = self.expiry - self.REFRESH_AHEAD - time.time()
+            if wait > 0:
+                # Wake up at least hourly so a suspended Mac doesn't oversleep
+                self._refresher_stop.wait(min(wait, 60 * 60))
+                continue
 
-            
-            latest = graph_obj.current
-            history = graph_obj.history or []
-            
-            if not latest:
-                # Return partial result with connection status even if no latest reading
-                sensor_activated, sensor_expires = self._extract_sensor_times(graph_response)
-                result = {
-                    "Value": None,
-                    "TrendArrow": None,
-                    "Timestamp": None,
-                    "GraphData": [],
-                    "ConnectionStatus": connection_status
-                }
-                if sensor_activated:
-                    result["SensorActivated"] = sensor_activated
-                if sensor_expires:
-                    result["SensorExpires"] = sensor_expires
-                return result
+            cooldown = self.governor.cooldown_remaining()
+            if cooldown:
+                self._refresher_stop.wait(cooldown)
+                continue
 
+            print(f"Token expires at {datetime.fromtimestamp(self.expiry)}; refreshing session")
+            if self.login():
+                failures = 0
+            else:
+                self._refresher_stop.wait(retry_delay(failures, self.REFRESH_RETRY_BASE, self.REFRESH_RETRY_MAX))
+                failures += 1
 
+    def _parse_graph(self, graph_response):
+        with PARSE_SECONDS.time():
+            return self._parse_graph_timed(graph_response)
 
-            
-            def fmt_ts(dt):
-                return dt.strftime("%m/%d/%Y %I:%M:%S %p")
-
-            gdata = []
-            for h in history:
-                gdata.append({
-                    "Value": h.value,
-                    "Timestamp": fmt_ts(h.timestamp),
-                    "FactoryTimestamp": h.factory_timestamp.isoformat()
-                })
-            
-            if latest:
-                should_append = False
-                if not gdata:
-                    should_append = True
-                else:
-                    last_hist = history[-1]
-                    if latest.timestamp > last_hist.timestamp:
-                        should_append = True
-                
-                if should_append:
-                    gdata.append({
-                        "Value": latest.value,
-                        "Timestamp": fmt_ts(latest.timestamp),
-                        "FactoryTimestamp": latest.factory_timestamp.isoformat()
-                    })
-            
-            sensor_activated = None
-            sensor_expires = None
-            try:
-                sensor_activated, sensor_expires = self._extract_sensor_times(graph_response)
-                if not sensor_expires:
-                    sensor = graph_obj.data.connection.sensor
-                    if sensor and sensor.a:
-                        sensor_activated = self._normalize_timestamp(sensor.a) or sensor_activated
-                        duration_seconds = self._infer_sensor_duration_seconds(sensor)
-                        if sensor_activated and duration_seconds:
-                            sensor_expires = sensor_activated + duration_seconds
-            except Exception as e:
-                print(f"Could not extract sensor data: {e}")
-            
+    def _parse_graph_timed(self, graph_response):
+        if not self.strict_parsing:
+            return parse_graph(graph_response)
+        try:
+            return parse_graph_strict(graph_response)
+        except ValidationError as e:
+            # Usually signal loss (null glucoseMeasurement); keep connection and sensor info
+            print(f"Graph response failed strict validation: {e}")
+            parsed = parse_graph(graph_response)
+            parsed.current = None
+            return parsed
+
+    def _process_graph_response(self, patient_id, graph_response):
+        """Turn a raw graph response into the result dict returned by get_latest_glucose."""
+        parsed = self._parse_graph(graph_response)
+        sensor_activated, sensor_expires = self._resolve_sensor_times(
+            parsed.sensor_serial, parsed.sensor_activated, parsed.sensor_expires)
+
+        patient_key = str(patient_id)
+        if parsed.current is None:
+            # API returned None for glucoseMeasurement (signal loss):
+            # return partial result with connection status
+            self.high_water_marks.pop(patient_key, None)
+            SIGNAL_LOSS.inc()
             result = {
-                "Value": latest.value,
-                "TrendArrow": latest.trend.value, 
-                "Timestamp": fmt_ts(latest.timestamp),
-                "GraphData": gdata,
-                "ConnectionStatus": connection_status
+                "Value": None,
+                "TrendArrow": None,
+                "Timestamp": None,
+                "GraphData": ReadingSeries(),
+                "ConnectionStatus": parsed.connection_status
             }
-
-            
             if sensor_activated:
                 result["SensorActivated"] = sensor_activated
             if sensor_expires:
                 result["SensorExpires"] = sensor_expires
-                
             return result
 
+        # Only readings newer than the high-water mark are emitted, so the
+        # work done per poll doesn't grow with the length of the history.
+        history = parsed.history
+        high_water_mark = self.high_water_marks.get(patient_key)
+        reset = high_water_mark is None
 
+        start = len(history)
+        if reset:
+            start = 0
+        else:
+            while start > 0 and history.times[start - 1] > high_water_mark:
+                start -= 1
+        new_readings = history[start:]
+
+        if new_readings:
+            high_water_mark = new_readings.last_time()
+            self.high_water_marks[patient_key] = high_water_mark
+
+        # The current reading is a live tail after the last history point;
+        # it is re-sent every poll and replaced by the UI rather than appended.
+        latest_ts, latest_value = parsed.current
+        current = None
+        if high_water_mark is None or latest_ts > high_water_mark:
+            current = parsed.current
+
+        self._store_readings(patient_id, new_readings, parsed.current, parsed.trend)
+
+        result = {
+            "Value": latest_value,
+            "TrendArrow": parsed.trend,
+            "Timestamp": latest_ts,
+            "NewReadings": new_readings,
+            "Current": current,
+            "Reset": reset,
+            "ConnectionStatus": parsed.connection_status
+        }
+
+        if sensor_activated:
+            result["SensorActivated"] = sensor_activated
+        if sensor_expires:
+            result["SensorExpires"] = sensor_expires
             
+        return result
 
-        except AuthenticationError:
+    def _handle_fetch_error(self, e):
+        """Log and classify a fetch failure: "relogin", "retry" or None (give up)."""
+        if isinstance(e, ValidationError):
+            print(f"Data format error (likely redirect): {e}. Relogging...")
+            return "relogin"
+
+        if isinstance(e, AuthenticationError):
             print("Authentication failed. Token likely expired. Relogging...")
-            if self.login() and retry:
-                return self.get_latest_glucose(retry=False)
+            self._invalidate_patients()
+            return "relogin"
+
+        if isinstance(e, (LLUAPIRateLimitError, RateLimitCooldown)):
+            print(f"Glucose fetch rate limited: {e}")
+            self._set_rate_limit_error(e)
             return None
 
+        if isinstance(e, PatientNotFoundError):
+            print("Patient not found. Refreshing connections...")
+            self._invalidate_patients()
+            return "retry"
+
+        print(f"Glucose fetch error: {e}")
+        if self._response_status(e) in (401, 403, 404):
+            self._invalidate_patients()
+        # Catch other potential auth errors
+        if "401" in str(e) or "403" in str(e):
+            return "relogin"
+        return None
+
+    def _needs_login(self):
+        if not self.client.token:
+            return True
+        if time.time() > self.expiry:
+            print("Token likely expired. Relogging...")
+            return True
+        return False
+
+    def _recovery(self, errors, retry):
+        """Log and classify failed fetches: (log in again first?, fetch again?).
+
+        The one place the sync and async fetch paths decide how to recover.
+        """
+        actions = {self._handle_fetch_error(e) for e in errors}
+        return "relogin" in actions, bool(retry and actions & {"relogin", "retry"})
+
+    def _patient_ids(self):
+        """Connected patient ids, the followed one first."""
+        patients = self._get_patients()
+        if not patients:
+            print("No patients found.")
+            self._invalidate_patients()
+            return []
+        patient_ids = [p.patient_id for p in patients]
+        if str(patient_ids[0]) != self.followed_patient_id:
+            self.followed_patient_id = str(patient_ids[0])
+            self._save_session()
+        return patient_ids
+
+    def get_latest_glucose(self, retry=True):
+        with profiling.section("get_latest_glucose"):
+            return self._latest_glucose(retry)
+
+    def _latest_glucose(self, retry):
+        try:
+            self.last_error = None
+            if self._needs_login() and not self.login():
+                return None
+            patient_ids = self._patient_ids()
+            if not patient_ids:
+                return None
+            return self._fetch_patient(patient_ids[0])
+
         except Exception as e:
-            print(f"Glucose fetch error: {e}")
-            if "429" in str(e) or "Too Many Requests" in str(e):
-                self.last_error = {
-                    "type": "rate_limit",
-                    "message": "Rate limit hit. Backing off and retrying."
-                }
+            relogin, again = self._recovery([e], retry)
+            if relogin and not self.login():
                 return None
-            
-            # Catch other potential auth errors
-            if "401" in str(e) or "403" in str(e):
-                 if self.login() and retry:
-                     return self.get_latest_glucose(retry=False)
-            return None
+            return self.get_latest_glucose(retry=False) if again else None
+
+    def _fetch_patient(self, patient_id):
+        with GRAPH_SECONDS.time():
+            graph_response = self.client._get_graph_data_json(patient_id)
+        return self._process_graph_response(patient_id, graph_response)
+
+    def _fetch_patient_paced(self, patient_id):
+        with self.governor.waiting(self.FANOUT_MAX_WAIT):
+            return self._fetch_patient(patient_id)
+
+    def _retry_ids(self, failed_ids):
+        """Failed patients still on a freshly fetched connection list."""
+        self._invalidate_patients()
+        try:
+            current = {str(p.patient_id) for p in self._get_patients()}
+        except Exception as e:
+            print(f"Failed to refresh patients: {e}")
+            return []
+        return [pid for pid in failed_ids if str(pid) in current]
+
+    def _fetch_patients_concurrently(self, patient_ids, max_workers):
+        results = {}
+        errors = {}
+        if not patient_ids:
+            return results, errors
+        workers = max(1, min(max_workers, len(patient_ids)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="schugaa-patient") as pool:
+            futures = {pool.submit(self._fetch_patient_paced, pid): pid for pid in patient_ids}
+            for future in as_completed(futures):
+                pid = futures[future]
+                try:
+                    results[str(pid)] = future.result()
+                except Exception as e:
+                    errors[pid] = e
+        return results, errors
+
+    def get_all_glucose(self, retry=True, max_workers=4):
+        """Fetch every connected patient's graph concurrently under one authenticated session.
 
+        Returns {patient_id: result}, where result has the same shape as
+        get_latest_glucose() and is None for patients whose fetch failed.
+        """
+        try:
+            self.last_error = None
+            if self._needs_login() and not self.login():
+                return {}
+            patient_ids = self._patient_ids()
+        except Exception as e:
+            relogin, again = self._recovery([e], retry)
+            if relogin and not self.login():
+                return {}
+            return self.get_all_glucose(retry=False, max_workers=max_workers) if again else {}
+
+        results, errors = self._fetch_patients_concurrently(patient_ids, max_workers)
+        if errors:
+            relogin, again = self._recovery(errors.values(), retry)
+            if again and (not relogin or self.login()):
+                retried, retry_errors = self._fetch_patients_concurrently(self._retry_ids(list(errors)), max_workers)
+                results.update(retried)
+                for e in retry_errors.values():
+                    self._handle_fetch_error(e)
+        return {str(pid): results.get(str(pid)) for pid in patient_ids}
@@ -0,0 +1,163 @@
+import asyncio
+import time
+
+from libre_api import LibreClient
+from rate_limit import retry_delay
+
+
+class AsyncLibreClient:
+    """asyncio counterpart of LibreClient with the same login / get_latest_glucose surface.
+
+    Requests still go through the wrapped LibreClient's pooled session and
+    rate-limit governor; they run in worker threads via asyncio.to_thread,
+    while everything that used to block the calling thread (login retries,
+    backoff sleeps, waiting for another coroutine's login) is awaited instead.
+    One event loop can therefore poll many accounts at once, and callers can
+    cancel any call or bound it with a timeout. A cancelled request's thread
+    finishes on its own, bounded by the session's HTTP timeouts.
+    """
+
+    def __init__(self, email, password, region="eu", client=None, **client_kwargs):
+        self.sync = client or LibreClient(email, password, region, **client_kwargs)
+
+    @property
+    def region(self):
+        return self.sync.region
+
+    @property
+    def expiry(self):
+        return self.sync.expiry
+
+    @property
+    def last_error(self):
+        return self.sync.last_error
+
+    @property
+    def store(self):
+        return self.sync.store
+
+    async def load_session(self):
+        await asyncio.to_thread(self.sync._load_session)
+
+    async def save_session(self):
+        await asyncio.to_thread(self.sync._save_session)
+
+    async def login(self, timeout=None):
+        if timeout is None:
+            return await self._login()
+        return await asyncio.wait_for(self._login(), timeout)
+
+    async def _login(self, generation=None):
+        # Each attempt takes the sync client's _login_lock in a worker thread, so
+        # this can't race its token refresher; only the wait between attempts is async.
+        sync = self.sync
+        if generation is None:
+            generation = sync._login_generation
+        for attempt in range(sync.LOGIN_ATTEMPTS):
+            outcome = await asyncio.to_thread(sync.login_attempt, attempt, generation)
+            if outcome == "error" and attempt < sync.LOGIN_ATTEMPTS - 1:
+                await asyncio.sleep(sync.login_retry_delay(attempt))
+            elif outcome != "redirected":
+                return outcome == "logged_in"
+        return False
+
+    async def run_token_refresh(self):
+        """Keep the session fresh: log in again shortly before the token expires.
+
+        Run it as a task next to the polling loop and cancel it on shutdown.
+        """
+        sync = self.sync
+        failures = 0
+        while True:
+            if not sync.client.token:
+                await asyncio.sleep(60)
+                continue
+            wait = sync.expiry - sync.REFRESH_AHEAD - time.time()
+            if wait > 0:
+                await asyncio.sleep(min(wait, 60 * 60))
+                continue
+            cooldown = sync.governor.cooldown_remaining()
+            if cooldown:
+                await asyncio.sleep(cooldown)
+                continue
+            if await self._login():
+                failures = 0
+            else:
+                await asyncio.sleep(retry_delay(failures, sync.REFRESH_RETRY_BASE, sync.REFRESH_RETRY_MAX))
+                failures += 1
+
+    async def get_latest_glucose(self, retry=True, timeout=None):
+        if timeout is None:
+            return await self._get_latest_glucose(retry)
+        return await asyncio.wait_for(self._get_latest_glucose(retry), timeout)
+
+    async def _get_latest_glucose(self, retry):
+        # Same steps and recovery decisions as LibreClient._latest_glucose
+        sync = self.sync
+        generation = sync._login_generation
+        try:
+            sync.last_error = None
+            if sync._needs_login() and not await self._login(generation):
+                return None
+            patient_ids = await asyncio.to_thread(sync._patient_ids)
+            if not patient_ids:
+                return None
+            return await asyncio.to_thread(sync._fetch_patient, patient_ids[0])
+
+        except Exception as e:
+            relogin, again = sync._recovery([e], retry)
+            if relogin and not await self._login(generation):
+                return None
+            return await self._get_latest_glucose(retry=False) if again else None
+
+    async def get_all_glucose(self, retry=True, max_concurrency=4, timeout=None):
+        """Fetch every connected patient concurrently; returns {patient_id: result or None}."""
+        if timeout is None:
+            return await self._get_all_glucose(retry, max_concurrency)
+        return await asyncio.wait_for(self._get_all_glucose(retry, max_concurrency), timeout)
+
+    async def _get_all_glucose(self, retry, max_concurrency):
+        # Same steps and recovery decisions as LibreClient.get_all_glucose
+        sync = self.sync
+        generation = sync._login_generation
+        try:
+            sync.last_error = None
+            if sync._needs_login() and not await self._login(generation):
+                return {}
+            patient_ids = await asyncio.to_thread(sync._patient_ids)
+        except Exception as e:
+            relogin, again = sync._recovery([e], retry)
+            if relogin and not await self._login(generation):
+                return {}
+            return await self._get_all_glucose(False, max_concurrency) if again else {}
+
+        results, errors = await self._fetch_concurrently(patient_ids, max_concurrency)
+        if errors:
+            relogin, again = sync._recovery(errors.values(), retry)
+            if again and (not relogin or await self._login(generation)):
+                retry_ids = await asyncio.to_thread(sync._retry_ids, list(errors))
+                retried, retry_errors = await self._fetch_concurrently(retry_ids, max_concurrency)
+                results.update(retried)
+                for e in retry_errors.values():
+                    sync._handle_fetch_error(e)
+        return {str(pid): results.get(str(pid)) for pid in patient_ids}
+
+    async def _fetch_concurrently(self, patient_ids, max_concurrency):
+        """Async counterpart of LibreClient._fetch_patients_concurrently: (results, errors)."""
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch(patient_id):
+            async with semaphore:
+                try:
+                    return patient_id, await asyncio.to_thread(self.sync._fetch_patient_paced, patient_id), None
+                except Exception as e:
+                    return patient_id, None, e
+
+        results = {}
+        errors = {}
+        for patient_id, result, error in await asyncio.gather(*(fetch(pid) for pid in patient_ids)):
+            if error is None:
+                results[str(patient_id)] = result
+            else:
+                errors[patient_id] = error
+        return results, errors
@@ -0,0 +1,213 @@
+"""Backfill local history from a LibreView CSV export.
+
+    python libreview_import.py ~/Downloads/JohnDoe_glucose_2026-10-17.csv
+
+LibreView (libreview.com -> Glucose History -> Download) exports every
+historic (15-minute) and scan reading the sensor ever uploaded. Rows are
+read and stored in batches, so multi-year files import with constant
+memory. Readings already in ~/.schugaa/readings.db are skipped, including
+ones fetched from LibreLinkUp whose timestamps differ by a few seconds.
+"""
+import argparse
+import csv
+import sys
+import time
+from bisect import bisect_left
+from datetime import datetime
+
+from reading_store import ReadingStore
+from readings import MMOL_FACTOR
+
+BATCH_SIZE = 5000
+# LibreView device times have minute resolution; LibreLinkUp's are to the second
+DUPLICATE_WINDOW = 60
+HISTORIC, SCAN = "0", "1"
+DATE_FORMATS = (
+    "%m-%d-%Y %I:%M %p",
+    "%d-%m-%Y %H:%M",
+    "%m/%d/%Y %I:%M %p",
+    "%d/%m/%Y %H:%M",
+    "%d.%m.%Y %H:%M",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d %H:%M:%S",
+)
+
+
+class ImportStats:
+    def __init__(self):
+        self.rows = 0
+        self.readings = 0
+        self.skipped = 0
+        self.duplicates = 0
+        self.added = 0
+
+
+class LibreViewReader:
+    """Yields (epoch seconds, mg/dL) from a LibreView CSV, one pass, without buffering the file.
+
+    Device timestamps are the phone's local time and are interpreted in this
+    machine's timezone unless `utc_offset` (hours) is given.
+    """
+
+    def __init__(self, stream, date_format=None, utc_offset=None, stats=None):
+        self.stream = stream
+        self.date_formats = (date_format,) if date_format else DATE_FORMATS
+        self._date_format = date_format
+        self.utc_offset = utc_offset
+        self.stats = stats or ImportStats()
+
+    def _header(self):
+        # The first line is "Glucose Data,Generated on,...", the column header follows
+        for _ in range(5):
+            line = self.stream.readline()
+            if not line:
+                break
+            if "Device Timestamp" in line:
+                delimiter = max(",;\t", key=line.count)
+                return next(csv.reader([line], delimiter=delimiter)), delimiter
+        raise ValueError("Not a LibreView glucose export (no 'Device Timestamp' column; "
+                         "export with English column names)")
+
+    def _column(self, header, prefix):
+        for index, name in enumerate(header):
+            if name.startswith(prefix):
+                return index, MMOL_FACTOR if "mmol" in name else 1.0
+        raise ValueError(f"Missing column '{prefix} ...'")
+
+    def _timestamp(self, text):
+        if self._date_format:
+            try:
+                parsed = datetime.strptime(text, self._date_format)
+                return self._epoch(parsed)
+            except ValueError:
+                if len(self.date_formats) == 1:
+                    raise
+        for date_format in self.date_formats:
+            try:
+                parsed = datetime.strptime(text, date_format)
+            except ValueError:
+                continue
+            self._date_format = date_format
+            return self._epoch(parsed)
+        raise ValueError(f"Unrecognised timestamp: {text}")
+
+    def _epoch(self, parsed):
+        if self.utc_offset is None:
+            return int(parsed.timestamp())
+        return int((parsed - datetime(1970, 1, 1)).total_seconds() - self.utc_offset * 3600)
+
+    def __iter__(self):
+        header, delimiter = self._header()
+        ts_index = header.index("Device Timestamp")
+        type_index = header.index("Record Type")
+        historic_index, historic_factor = self._column(header, "Historic Glucose")
+        scan_index, scan_factor = self._column(header, "Scan Glucose")
+        stats = self.stats
+
+        for row in csv.reader(self.stream, delimiter=delimiter):
+            stats.rows += 1
+            if len(row) <= max(ts_index, type_index, historic_index, scan_index):
+                stats.skipped += 1
+                continue
+            record_type = row[type_index]
+            if record_type == HISTORIC:
+                raw, factor = row[historic_index], historic_factor
+            elif record_type == SCAN:
+                raw, factor = row[scan_index], scan_factor
+            else:
+                # Notes, insulin, food, strip readings, ...
+                stats.skipped += 1
+                continue
+            try:
+                value = float(raw.replace(",", ".")) * factor
+                ts = self._timestamp(row[ts_index])
+            except ValueError:
+                stats.skipped += 1
+                continue
+            stats.readings += 1
+            yield ts, round(value, 1)
+
+
+def _without_duplicates(store, batch, patient_id, stats):
+    """Drop readings within DUPLICATE_WINDOW of one already stored (exact repeats are left to the store)."""
+    start = min(ts for ts, _ in batch) - DUPLICATE_WINDOW
+    end = max(ts for ts, _ in batch) + DUPLICATE_WINDOW
+    stored = store.timestamps_between(start, end, patient_id)
+    if not stored:
+        return batch
+    kept = []
+    for ts, value in batch:
+        index = bisect_left(stored, ts - DUPLICATE_WINDOW)
+        if index < len(stored) and stored[index] <= ts + DUPLICATE_WINDOW and stored[index] != ts:
+            stats.duplicates += 1
+            continue
+        kept.append((ts, value))
+    return kept
+
+
+def import_libreview(store, stream, patient_id=None, batch_size=BATCH_SIZE, date_format=None, utc_offset=None):
+    """Import a LibreView CSV from a text stream; returns ImportStats.
+
+    Without a patient_id, readings go to the patient with the most recent
+    reading (the one the app follows). On an empty store that patient isn't
+    known yet, and readings stored under a guessed id would never be shown.
+    """
+    if patient_id is None:
+        patient_id = store.latest_patient_id()
+        if patient_id is None:
+            raise ValueError("No readings stored yet, so the patient id is unknown. "
+                             "Let the app fetch once before importing, or pass --patient")
+    stats = ImportStats()
+    reader = LibreViewReader(stream, date_format, utc_offset, stats)
+
+    def flush(batch):
+        batch = _without_duplicates(store, batch, patient_id, stats)
+        before = stats.added
+        stats.added += store.add_readings(((ts, value, None) for ts, value in batch), patient_id=patient_id)
+        # Exact repeats (e.g. importing the same file twice) are ignored by the store
+        stats.duplicates += len(batch) - (stats.added - before)
+
+    batch = []
+    for reading in reader:
+        batch.append(reading)
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("csv_file", help="LibreView glucose export (.csv), or - for stdin")
+    parser.add_argument("--patient", help="patient id to store under (default: the one the app follows)")
+    parser.add_argument("--date-format", help="strptime format of Device Timestamp (default: detected)")
+    parser.add_argument("--utc-offset", type=float,
+                        help="hours the device clock was ahead of UTC (default: this machine's timezone)")
+    parser.add_argument("--db", help="readings database (default: ~/.schugaa/readings.db)")
+    args = parser.parse_args()
+
+    store = ReadingStore(args.db)
+    started = time.perf_counter()
+    try:
+        if args.csv_file == "-":
+            stats = import_libreview(store, sys.stdin, args.patient, date_format=args.date_format,
+                                     utc_offset=args.utc_offset)
+        else:
+            with open(args.csv_file, newline="", encoding="utf-8-sig") as stream:
+                stats = import_libreview(store, stream, args.patient, date_format=args.date_format,
+                                         utc_offset=args.utc_offset)
+    except (OSError, ValueError) as e:
+        print(f"Failed to import readings: {e}", file=sys.stderr)
+        return 1
+    finally:
+        store.close()
+
+    print(f"Imported {stats.added} new readings from {stats.rows} rows in {time.perf_counter() - started:.1f}s "
+          f"({stats.duplicates} already stored, {stats.skipped} rows without a glucose reading)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,317 @@
+"""Serve the latest reading, trend and recent history over local HTTP/JSON.
+
+Dashboards, scripts and other machines read from here instead of logging in
+to LibreLinkUp themselves, so any number of consumers costs no upstream
+requests. Responses come straight from memory: /latest and /trend are
+encoded once per poll, /history once per poll and window.
+
+    GET /latest[?patient=<id>]
+    GET /trend[?patient=<id>]
+    GET /history[?patient=<id>&hours=3]
+    GET /patients
+    GET /health
+    GET /events              server-sent events: reading, connection, sensor
+    GET /metrics             Prometheus text format
+    GET /metrics.json        the same counters and histograms as JSON
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import metrics
+from pubsub import EventBroker, result_events
+from readings import ReadingSeries
+
+DEFAULT_PORT = 8765
+# Comment line sent to idle event streams so proxies and clients keep them open
+KEEPALIVE_SECONDS = 15
+TREND_NAMES = {1: "down_fast", 2: "down", 3: "stable", 4: "up", 5: "up_fast"}
+TREND_ARROWS = {1: "↓", 2: "↘", 3: "→", 4: "↗", 5: "↑"}
+
+
+def _encode(doc):
+    return json.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat() if ts else None
+
+
+class ReadingState:
+    """Latest poll result and recent history per patient, kept for the local API.
+
+    update() is called by whoever polls (the app or the daemon) with the
+    result dict from LibreClient; readers only ever see pre-built bytes.
+    Each update also publishes what changed to `broker`.
+    Patient "" is the single patient followed by get_latest_glucose().
+    """
+
+    def __init__(self, history_seconds=24 * 60 * 60, broker=None):
+        self.history_seconds = history_seconds
+        self.broker = broker or EventBroker()
+        self._lock = threading.Lock()
+        self._patients = {}
+        self._history_cache = {}
+        self.version = 0
+        self.updated_at = None
+
+    def _entry(self, patient_id):
+        entry = self._patients.get(patient_id)
+        if entry is None:
+            entry = {"history": ReadingSeries(), "latest": None, "latest_json": None, "trend_json": None}
+            self._patients[patient_id] = entry
+        return entry
+
+    def _trim(self, history):
+        if not history:
+            return history
+        start = bisect_left(history.times, history.times[-1] - self.history_seconds)
+        return history[start:] if start else history
+
+    def seed_history(self, patient_id, series):
+        """Fill history from the local store before the first poll."""
+        with self._lock:
+            entry = self._entry(patient_id)
+            entry["history"] = self._trim(series.copy())
+            self._changed()
+
+    def update(self, patient_id, result):
+        if not result or result.get("Error"):
+            return
+        now = int(time.time())
+        with self._lock:
+            entry = self._entry(patient_id)
+            history = entry["history"]
+            new_readings = result.get("NewReadings")
+            if new_readings is not None:
+                if result.get("Reset"):
+                    history = new_readings.copy()
+                else:
+                    history.extend(new_readings)
+            elif result.get("GraphData"):
+                history = result["GraphData"].copy()
+            entry["history"] = self._trim(history)
+
+            previous = entry["latest"] or {}
+            value = result.get("Value")
+            latest = {
+                "patient_id": patient_id,
+                "value": value if value is not None else previous.get("value"),
+                "unit": "mg/dL",
+                "trend": result.get("TrendArrow") if value is not None else previous.get("trend"),
+                "timestamp": result.get("Timestamp") or previous.get("timestamp"),
+                "signal_loss": value is None,
+                "connection_status": result.get("ConnectionStatus"),
+                "sensor_activated": result.get("SensorActivated"),
+                "sensor_expires": result.get("SensorExpires"),
+                "fetched_at": now,
+            }
+            latest["time"] = _iso(latest["timestamp"])
+            entry["latest"] = latest
+            entry["latest_json"] = _encode(latest)
+
+            trend = latest["trend"]
+            entry["trend_json"] = _encode({
+                "patient_id": patient_id,
+                "trend": trend,
+                "name": TREND_NAMES.get(trend),
+                "arrow": TREND_ARROWS.get(trend),
+                "value": latest["value"],
+                "timestamp": latest["timestamp"],
+                "delta": self._delta(entry["history"], latest),
+                "signal_loss": latest["signal_loss"],
+            })
+            self.updated_at = now
+            self._changed()
+            events = result_events(patient_id, previous, latest, new_readings)
+
+        for name, data in events:
+            self.broker.publish(name, data)
+
+    def _delta(self, history, latest):
+        """mg/dL change since the last history reading before the current one."""
+        if not history or latest["value"] is None or not latest["timestamp"]:
+            return None
+        index = bisect_left(history.times, latest["timestamp"]) - 1
+        if index < 0:
+            return None
+        return round(latest["value"] - history.values[index], 1)
+
+    def _changed(self):
+        self.version += 1
+        self._history_cache.clear()
+
+    def _resolve(self, patient_id):
+        if patient_id is not None:
+            return patient_id if patient_id in self._patients else None
+        if "" in self._patients:
+            return ""
+        return next(iter(self._patients), None)
+
+    def latest_json(self, patient_id=None):
+        with self._lock:
+            pid = self._resolve(patient_id)
+            return self._patients[pid]["latest_json"] if pid is not None else None
+
+    def trend_json(self, patient_id=None):
+        with self._lock:
+            pid = self._resolve(patient_id)
+            return self._patients[pid]["trend_json"] if pid is not None else None
+
+    def history_json(self, patient_id=None, hours=12.0):
+        with self._lock:
+            pid = self._resolve(patient_id)
+            if pid is None:
+                return None
+            key = (pid, hours)
+            cached = self._history_cache.get(key)
+            if cached is None:
+                history = self._patients[pid]["history"]
+                start = bisect_left(history.times, history.times[-1] - hours * 3600) if history else 0
+                cached = _encode({
+                    "patient_id": pid,
+                    "unit": "mg/dL",
+                    "hours": hours,
+                    "readings": [[ts, value] for ts, value in history[start:]],
+                })
+                self._history_cache[key] = cached
+            return cached
+
+    def patients_json(self):
+        with self._lock:
+            return _encode({"patients": [
+                {"patient_id": pid, "timestamp": (entry["latest"] or {}).get("timestamp"),
+                 "readings": len(entry["history"])}
+                for pid, entry in self._patients.items()
+            ]})
+
+
+class LocalAPIHandler(BaseHTTPRequestHandler):
+    server_version = "Schugaa"
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; don't let Nagle hold the body back
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload, content_type="application/json; charset=utf-8"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        state = self.server.state
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        patient = query.get("patient", [None])[0]
+        self.server.request_count += 1
+
+        if url.path == "/latest":
+            payload = state.latest_json(patient)
+        elif url.path == "/trend":
+            payload = state.trend_json(patient)
+        elif url.path == "/history":
+            try:
+                hours = float(query.get("hours", ["12"])[0])
+            except ValueError:
+                return self._send(400, _encode({"error": "hours must be a number"}))
+            payload = state.history_json(patient, max(0.0, min(hours, state.history_seconds / 3600)))
+        elif url.path == "/patients":
+            payload = state.patients_json()
+        elif url.path == "/events":
+            return self._stream_events()
+        elif url.path == "/metrics":
+            return self._send(200, metrics.render_prometheus().encode("utf-8"),
+                              "text/plain; version=0.0.4; charset=utf-8")
+        elif url.path == "/metrics.json":
+            payload = _encode(metrics.snapshot())
+        elif url.path == "/health":
+            payload = _encode({"status": "ok", "updated_at": state.updated_at, "version": state.version})
+        else:
+            return self._send(404, _encode({"error": "not found"}))
+
+        if payload is None:
+            return self._send(503, _encode({"error": "no reading yet"}))
+        self._send(200, payload)
+
+    def _stream_events(self):
+        try:
+            last_event_id = int(self.headers.get("Last-Event-ID"))
+        except (TypeError, ValueError):
+            last_event_id = None
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        subscription = self.server.state.broker.subscribe(last_event_id)
+        try:
+            self.wfile.write(b"retry: 5000\n\n")
+            while not self.server.stopping:
+                events = subscription.get(timeout=KEEPALIVE_SECONDS)
+                if events:
+                    self.wfile.write(b"".join(event.frame for event in events))
+                else:
+                    self.wfile.write(b": keepalive\n\n")
+        except (BrokenPipeError, ConnectionResetError, OSError):
+            pass
+        finally:
+            subscription.close()
+
+
+class LocalAPIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, state, host="127.0.0.1", port=DEFAULT_PORT):
+        super().__init__((host, port), LocalAPIHandler)
+        self.state = state
+        self.request_count = 0
+        self.stopping = False
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="schugaa-local-api", daemon=True)
+        self._thread.start()
+        print(f"Local API listening on {self.url}")
+        return self
+
+    def stop(self):
+        self.stopping = True
+        self.shutdown()
+        self.server_close()
+
+
+def configured_port(config=None):
+    """Port from SCHUGAA_LOCAL_API_PORT or the config's local_api_port; None means disabled."""
+    value = os.environ.get("SCHUGAA_LOCAL_API_PORT") or (config or {}).get("local_api_port")
+    try:
+        port = int(value)
+    except (TypeError, ValueError):
+        return None
+    return port if port > 0 else None
+
+
+def start_local_api(state, port=None, host="127.0.0.1"):
+    """Start the API in a background thread, or return None if it can't bind."""
+    try:
+        return LocalAPIServer(state, host, DEFAULT_PORT if port is None else port).start()
+    except OSError as e:
+        print(f"Failed to start local API: {e}")
+        return None
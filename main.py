@@ -2,13 +2,24 @@ import warnings
 warnings.simplefilter("ignore")
 
 import rumps
-import json
 import threading
 import os
 import sys
 import time
 import math
+from app_config import (delete_keyring_password, write_json_secure, resource_path,
+                        get_config_path, load_config_data, decode_config, has_credentials,
+                        encode_credentials)
+import app_logging
+import metrics
+import profiling
 from libre_api import LibreClient
+from poll_scheduler import PollScheduler
+from fetch_worker import FetchWorker
+from local_api import ReadingState, configured_port, start_local_api
+from readings import ReadingSeries, to_display_value
+from graph_geometry import (compute_geometry, calculate_stats, glucose_color_name, nearest_index,
+                            MARGIN_LEFT, MARGIN_RIGHT, MARGIN_BOTTOM)
 from AppKit import (NSImage, NSApplication, NSMenu, NSMenuItem, NSObject, NSView, NSBezierPath, 
                    NSTrackingArea, NSTextField, NSColor, NSFont, NSString,
                    NSTrackingMouseEnteredAndExited, NSTrackingMouseMoved, 
@@ -17,75 +28,15 @@ from AppKit import (NSImage, NSApplication, NSMenu, NSMenuItem, NSObject, NSView
                    NSParagraphStyleAttributeName, NSMutableParagraphStyle, NSWorkspace,
                    NSVisualEffectView, NSVisualEffectMaterialHUDWindow, NSVisualEffectBlendingModeBehindWindow,
                    NSVisualEffectStateActive, NSVisualEffectMaterialPopover, NSAppearance)
-from Foundation import NSMakeRect, NSURL, NSUserDefaults
+from Foundation import NSMakeRect, NSURL, NSUserDefaults, NSTimer
 import objc
+from PyObjCTools import AppHelper
 warnings.filterwarnings("ignore", category=objc.ObjCPointerWarning)
 
-MMOL_FACTOR = 18.0182
-
-def _get_keyring():
-    try:
-        import keyring  
-        return keyring
-    except Exception:
-        return None
-
-def get_keyring_password(email):
-    keyring = _get_keyring()
-    if not keyring or not email:
-        return None
-    try:
-        return keyring.get_password("schugaa", email)
-    except Exception:
-        return None
-
-def set_keyring_password(email, password):
-    keyring = _get_keyring()
-    if not keyring or not email or not password:
-        return False
-    try:
-        keyring.set_password("schugaa", email, password)
-        return True
-    except Exception:
-        return False
-
-def delete_keyring_password(email):
-    keyring = _get_keyring()
-    if not keyring or not email:
-        return False
-    try:
-        keyring.delete_password("schugaa", email)
-        return True
-    except Exception:
-        return False
-
-def unit_factor(unit):
-    return MMOL_FACTOR if unit == "mmol/L" else 1.0
-
-def to_display_value(value, unit):
-    if unit == "mmol/L":
-        return value / MMOL_FACTOR
-    return value
-
-def write_json_secure(path, data):
-    with open(path, "w") as f:
-        json.dump(data, f, indent=4)
-    try:
-        os.chmod(path, 0o600)
-    except Exception:
-        pass
-
-def resource_path(relative_path):
-    """ Get absolute path to resource, works for dev and for PyInstaller """
-    try:
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-
-    return os.path.join(base_path, relative_path)
-
 from datetime import datetime
-import queue
+
+DRAW_SECONDS = metrics.histogram("draw_seconds", "GraphPlotView.drawRect_")
+UPDATE_UI_SECONDS = metrics.histogram("update_ui_seconds", "Applying a fetch result to the menu and graph")
 
 def set_dock_icon():
     try:
@@ -112,7 +63,12 @@ class MenuActionHandler(NSObject):
     def logout_(self, sender):
         self.app.logout(sender)
         
+    def pollTimerFired_(self, timer):
+        self.app.poll_timer_fired()
+
     def quit_(self, sender):
+        profiling.stop()
+        app_logging.shutdown()
         rumps.quit_application()
 
     def setUnitMgdl_(self, sender):
@@ -125,10 +81,22 @@ class MenuActionHandler(NSObject):
         NSWorkspace.sharedWorkspace().openURL_(NSURL.URLWithString_("https://ko-fi.com/abhishek0978"))
 
     def shareDebugLogs_(self, sender):
-        if os.path.exists(log_path):
-             NSWorkspace.sharedWorkspace().selectFile_inFileViewerRootedAtPath_(log_path, None)
-        else:
-             print("Log file not found.")
+        try:
+            bundle_path = app_logging.export_debug_bundle(extra={
+                "metrics.json": metrics.snapshot(),
+                "connections.json": self.app.client.connection_stats(),
+            })
+            NSWorkspace.sharedWorkspace().selectFile_inFileViewerRootedAtPath_(bundle_path, None)
+        except Exception as e:
+            print(f"Failed to export debug logs: {e}")
+
+    def toggleProfiling_(self, sender):
+        if not profiling.is_active():
+            profiling.start()
+            sender.setTitle_("Stop Profiling")
+            return
+        sender.setTitle_("Start Profiling")
+        self.app.stop_profiling()
 
 class ThemeChangeObserver(NSObject):
     def initWithApp_(self, app):
@@ -148,7 +116,8 @@ class GraphPlotView(NSView):
         self = objc.super(GraphPlotView, self).initWithFrame_(frame)
         if self:
 
-            self.data_points = []
+            self.data_points = ReadingSeries()
+            self.data_version = 0
             self.hover_point = None
             self.unit = "mg/dL"
             
@@ -191,39 +160,7 @@ class GraphPlotView(NSView):
         return self
 
     def calculate_stats(self):
-        if not self.data_points:
-            self.stats = {"low": 0, "in_range": 0, "high": 0}
-            return
-
-        total = len(self.data_points)
-        low_count = 0
-        in_range_count = 0
-        high_count = 0
-        
-        
-        
-        unit = getattr(self, 'unit', 'mg/dL')
-        is_mmol = unit == 'mmol/L'
-        
-        limit_low = 3.9 if is_mmol else 70
-        limit_high = 10.0 if is_mmol else 180
-        
-        for val, _ in self.data_points:
-            
-            
-            if val < 70:
-                low_count += 1
-            elif val > 200:
-                high_count += 1
-            else:
-                in_range_count += 1
-
-                
-        self.stats = {
-            "low": int((low_count / total) * 100),
-            "in_range": int((in_range_count / total) * 100),
-            "high": int((high_count / total) * 100)
-        }
+        self.stats = calculate_stats(self.data_points.values)
 
     def is_dark_mode(self):
         """Check if system is in dark mode using effectiveAppearance"""
@@ -248,42 +185,78 @@ class GraphPlotView(NSView):
         return False
 
     def get_color(self, value):
-        if value < 70:
-            return NSColor.redColor()
-        elif 70 <= value <= 79:
-            return NSColor.yellowColor()
-        elif 80 <= value <= 180:
+        return self.color_for_name(glucose_color_name(value))
+
+    def color_for_name(self, name):
+        if name == "green":
             return NSColor.greenColor()
-        elif 181 <= value <= 220:
+        elif name == "yellow":
             return NSColor.yellowColor()
-        elif 221 <= value <= 250:
+        elif name == "orange":
             return NSColor.orangeColor()
-        else: 
-            return NSColor.redColor()
+        return NSColor.redColor()
 
     def set_trend(self, trend):
         self.trend = trend
         self.setNeedsDisplay_(True)
 
-    def update_data(self, data):
-        self.data_points = []
+    def update_data(self, series):
+        self.history_points = ReadingSeries()
+        self.live_point = None
         try:
-            for point in data:
-                val = point.get("Value")
-                ts = point.get("Timestamp")
+            for ts, val in series:
                 if val:
-                    self.data_points.append((val, ts))
+                    self.history_points.append(ts, val)
             
-            if len(self.data_points) > 100:
-                 self.data_points = self.data_points[-100:]
+            if len(self.history_points) > 100:
+                 self.history_points = self.history_points.tail(100)
                  
         except Exception as e:
             print(f"Error parsing graph data: {e}")
             
+        self.data_points = self.history_points.copy()
+        self.data_version = getattr(self, 'data_version', 0) + 1
         self.calculate_stats() 
         self.setNeedsDisplay_(True)
 
+    def append_data(self, new_series, current=None, reset=False):
+        """Apply an incremental fetch result: append new history, replace the live tail."""
+        if reset or not hasattr(self, 'history_points'):
+            self.history_points = ReadingSeries()
+        try:
+            for ts, val in new_series:
+                if val:
+                    self.history_points.append(ts, val)
+
+            if len(self.history_points) > 100:
+                 self.history_points = self.history_points.tail(100)
+
+            self.live_point = None
+            if current and current[1]:
+                self.live_point = current
+        except Exception as e:
+            print(f"Error parsing graph data: {e}")
+
+        self.data_points = self.history_points.copy()
+        if self.live_point:
+            self.data_points.append(*self.live_point)
+        self.data_version = getattr(self, 'data_version', 0) + 1
+        self.calculate_stats()
+        self.setNeedsDisplay_(True)
+
+    def _geometry_for(self, width, height, is_dark):
+        unit = getattr(self, 'unit', 'mg/dL')
+        key = (getattr(self, 'data_version', 0), width, height, unit, is_dark)
+        if getattr(self, '_geometry_key', None) != key:
+            self._geometry = compute_geometry(self.data_points, width, height, unit)
+            self._geometry_key = key
+        return self._geometry
+
     def drawRect_(self, rect):
+        with DRAW_SECONDS.time(), profiling.section("drawRect_"):
+            self.draw_graph(rect)
+
+    def draw_graph(self, rect):
         if not self.data_points:
              return
 
@@ -295,67 +268,24 @@ class GraphPlotView(NSView):
             NSColor.whiteColor().set()
         NSBezierPath.fillRect_(self.bounds())
         
-        width = rect.size.width
-        height = rect.size.height
-        
-        unit = getattr(self, 'unit', 'mg/dL')
-        is_mmol = unit == 'mmol/L'
-        factor = unit_factor(unit)
-        
-        if is_mmol:
-            max_y_val = 21.0
-            min_y_val = 0.0
-            grid_values = [3, 6, 9, 12, 15, 18, 21] 
-            val_70 = 3.9
-            val_180 = 10.0
-        else:
-            max_y_val = 300 
-            min_y_val = 50 
-            grid_values = [50, 100, 150, 200, 250, 300]
-            val_70 = 70
-            val_180 = 180
-
-        y_range = max_y_val - min_y_val
-        
-        margin_left = 45 
-        margin_right = 20
-        margin_top = 20 
-        margin_bottom = 75 
+        size = self.bounds().size
+        geo = self._geometry_for(size.width, size.height, is_dark)
         
-        plot_width = width - margin_left - margin_right
-        plot_height = height - margin_bottom - margin_top
-        
-        def get_y(val):
-            val_clamped = max(min(val, max_y_val), min_y_val)
-            normalized = (val_clamped - min_y_val) / y_range
-            return margin_bottom + normalized * plot_height
-
-        def get_x(index, total):
-            step = plot_width / max(total - 1, 1) if total > 1 else 0
-            return margin_left + index * step
-
-        y_low = get_y(val_70)
-        y_high = get_y(val_180)
-        
-        if y_high > y_low:
-             band_rect = NSMakeRect(margin_left, y_low, plot_width, y_high - y_low)
+        if geo.band:
+             band_rect = NSMakeRect(*geo.band)
              if is_dark:
                  NSColor.colorWithCalibratedRed_green_blue_alpha_(0.1, 0.3, 0.1, 0.6).set()
              else:
                  NSColor.colorWithCalibratedRed_green_blue_alpha_(0.90, 0.97, 0.92, 1.0).set()
              NSBezierPath.fillRect_(band_rect)
 
-        y_limit_high = get_y(250) if not is_mmol else get_y(13.9)
-        
         limit_path = NSBezierPath.bezierPath()
         limit_path.setLineWidth_(1.0)
         limit_path.setLineDash_count_phase_([6.0, 4.0], 2, 0.0)
         
-        limit_path.moveToPoint_((margin_left, y_low))
-        limit_path.lineToPoint_((width - margin_right, y_low))
-        
-        limit_path.moveToPoint_((margin_left, y_limit_high))
-        limit_path.lineToPoint_((width - margin_right, y_limit_high))
+        for start, end in geo.limit_lines:
+            limit_path.moveToPoint_(start)
+            limit_path.lineToPoint_(end)
         
         NSColor.colorWithCalibratedRed_green_blue_alpha_(0.8, 0.3, 0.3, 0.8).set()
         limit_path.stroke()
@@ -382,16 +312,13 @@ class GraphPlotView(NSView):
             NSParagraphStyleAttributeName: p_style
         }
 
-        for val in grid_values:
-            y = get_y(val)
-            if y >= margin_bottom and y <= height - margin_top:
-                grid_path.moveToPoint_((margin_left, y))
-                grid_path.lineToPoint_((width - margin_right, y))
-                
-                l_str = str(val)
-                s = NSString.stringWithString_(l_str).sizeWithAttributes_(y_label_attrs)
-                r = NSMakeRect(0, y - s.height/2 + 3, margin_left - 5, s.height)
-                NSString.stringWithString_(l_str).drawInRect_withAttributes_(r, y_label_attrs)
+        for y, l_str in geo.grid_lines:
+            grid_path.moveToPoint_((MARGIN_LEFT, y))
+            grid_path.lineToPoint_((geo.width - MARGIN_RIGHT, y))
+            
+            s = NSString.stringWithString_(l_str).sizeWithAttributes_(y_label_attrs)
+            r = NSMakeRect(0, y - s.height/2 + 3, MARGIN_LEFT - 5, s.height)
+            NSString.stringWithString_(l_str).drawInRect_withAttributes_(r, y_label_attrs)
                 
         if is_dark:
             NSColor.colorWithCalibratedWhite_alpha_(0.35, 1.0).set()  
@@ -399,22 +326,8 @@ class GraphPlotView(NSView):
             NSColor.colorWithCalibratedWhite_alpha_(0.85, 1.0).set()  
         grid_path.stroke()
 
-        
-        if not self.data_points: return
-        
-        points_coords = []
-        count = len(self.data_points)
-
-        
-        for i in range(count):
-            val, ts = self.data_points[i]
-            disp_val = val / factor
-            x = get_x(i, count)
-            y = get_y(disp_val)
-            points_coords.append((x, y, disp_val, ts, val))
-
         line_path = NSBezierPath.bezierPath()
-        for i, (x, y, _, _, _) in enumerate(points_coords):
+        for i, (x, y, _, _, _) in enumerate(geo.points):
             if i == 0: line_path.moveToPoint_((x, y))
             else: line_path.lineToPoint_((x, y))
             
@@ -427,47 +340,12 @@ class GraphPlotView(NSView):
         line_path.setLineJoinStyle_(1) 
         line_path.stroke()
         
-        hour_dots = []
-        
-        try:
-            import datetime as dt_module
-            
-            def parse_ts(t_str):
-                return dt_module.datetime.strptime(t_str, "%m/%d/%Y %I:%M:%S %p")
-
-            if points_coords:
-                last_point = points_coords[-1]
-                hour_dots.append(last_point)
-                
-                last_dot_time = parse_ts(last_point[3])
-                
-                for i in range(len(points_coords) - 2, -1, -1):
-                    p = points_coords[i]
-                    p_time = parse_ts(p[3])
-                    
-                    diff = (last_dot_time - p_time).total_seconds()
-                    
-                    if diff >= 3300: 
-                        hour_dots.append(p)
-                        last_dot_time = p_time
-
-        except Exception as e:
-            print(f"Error calculating dots: {e}")
-            for i, (x, y, _, _, raw_val) in enumerate(points_coords):
-                if i % 5 == 0 or i == len(points_coords) - 1:
-                    hour_dots.append((x, y, raw_val))
-        
         dot_radius = 5.0
-        for p in hour_dots:
-            if len(p) == 5:
-                x, y, _, _, raw_val = p
-            else:
-                x, y, raw_val = p
-                
+        for x, y, color_name in geo.hour_dots:
             dot_rect = NSMakeRect(x - dot_radius, y - dot_radius, dot_radius * 2, dot_radius * 2)
             dot_path = NSBezierPath.bezierPathWithOvalInRect_(dot_rect)
             
-            dot_color = self.get_color(raw_val)
+            dot_color = self.color_for_name(color_name)
             dot_color.set()
             dot_path.fill()
             
@@ -478,70 +356,37 @@ class GraphPlotView(NSView):
             dot_path.setLineWidth_(2.0)
             dot_path.stroke()
 
-        clean_coords = []
-        for p in points_coords:
-            clean_coords.append((p[0], p[1], p[2], p[3]))
-        self.points_coords = clean_coords
-
-        indices = [0, count//2, count-1]
-        for idx in indices:
-            if idx < count:
-                x = points_coords[idx][0]
-                ts = points_coords[idx][3]
-                try:
-                    import datetime
-                    dt = datetime.datetime.strptime(ts, "%m/%d/%Y %I:%M:%S %p")
-                    t_lbl = dt.strftime("%H")
-                    s = NSString.stringWithString_(t_lbl).sizeWithAttributes_(axis_attrs)
-                    r = NSMakeRect(x - s.width/2, margin_bottom - 28, s.width, s.height)
-                    NSString.stringWithString_(t_lbl).drawInRect_withAttributes_(r, axis_attrs)
-                    
-                    tick = NSBezierPath.bezierPath()
-                    tick.moveToPoint_((x, margin_bottom))
-                    tick.lineToPoint_((x, margin_bottom - 3))
-                    tick.setLineWidth_(1.0)
-                    tick.stroke()
-                except: pass
-                
-        
-        box_area_height = 34 
-        box_y = 5 
-        
-        
-        b_margin_left = margin_left + 40
-        b_margin_right = margin_right + 40 
-        
-        avail_width = width - b_margin_left - b_margin_right
-        gap = 25 
-        box_width = (avail_width - (2 * gap)) / 3
-        
-        categories = [
-            
-            ("High", self.stats.get("high", 0), 
-             NSColor.colorWithCalibratedRed_green_blue_alpha_(1.0, 0.6, 0.2, 0.15) if is_dark else NSColor.orangeColor().colorWithAlphaComponent_(0.1),
-             NSColor.orangeColor()),
-             
-            ("In Range", self.stats.get("in_range", 0),
-             NSColor.greenColor().colorWithAlphaComponent_(0.15),
-             NSColor.greenColor() if is_dark else NSColor.colorWithCalibratedRed_green_blue_alpha_(0.0, 0.45, 0.0, 1.0)),
-             
-            ("Low", self.stats.get("low", 0),
-             NSColor.redColor().colorWithAlphaComponent_(0.15),
-             NSColor.redColor())
-        ]
+        for x, t_lbl in geo.x_ticks:
+            s = NSString.stringWithString_(t_lbl).sizeWithAttributes_(axis_attrs)
+            r = NSMakeRect(x - s.width/2, MARGIN_BOTTOM - 28, s.width, s.height)
+            NSString.stringWithString_(t_lbl).drawInRect_withAttributes_(r, axis_attrs)
+            
+            tick = NSBezierPath.bezierPath()
+            tick.moveToPoint_((x, MARGIN_BOTTOM))
+            tick.lineToPoint_((x, MARGIN_BOTTOM - 3))
+            tick.setLineWidth_(1.0)
+            tick.stroke()
+        
+        box_colors = {
+            "high": (NSColor.colorWithCalibratedRed_green_blue_alpha_(1.0, 0.6, 0.2, 0.15) if is_dark else NSColor.orangeColor().colorWithAlphaComponent_(0.1),
+                     NSColor.orangeColor()),
+            "in_range": (NSColor.greenColor().colorWithAlphaComponent_(0.15),
+                         NSColor.greenColor() if is_dark else NSColor.colorWithCalibratedRed_green_blue_alpha_(0.0, 0.45, 0.0, 1.0)),
+            "low": (NSColor.redColor().colorWithAlphaComponent_(0.15),
+                    NSColor.redColor()),
+        }
         
         box_font = NSFont.boldSystemFontOfSize_(11)
         lbl_font = NSFont.systemFontOfSize_(9)
         
-        for i, (label, pct, bg_col, text_col) in enumerate(categories):
-            bx = b_margin_left + i * (box_width + gap)
-            b_rect = NSMakeRect(bx, box_y, box_width, box_area_height)
+        for key, label, pct, (bx, box_y, box_width, box_height) in geo.stat_boxes:
+            bg_col, text_col = box_colors[key]
+            b_rect = NSMakeRect(bx, box_y, box_width, box_height)
             
             path = NSBezierPath.bezierPathWithRoundedRect_xRadius_yRadius_(b_rect, 6, 6)
             bg_col.set()
             path.fill()
             
-            
             pct_str = f"{pct}%"
             
             pct_attrs = {
@@ -579,130 +424,142 @@ class GraphPlotView(NSView):
         if self.hover_point:
              hx, hy = self.hover_point
              NSColor.labelColor().set()
-             path = NSBezierPath.bezierPathWithRect_(NSMakeRect(hx-0.5, margin_bottom, 1, plot_height))
+             path = NSBezierPath.bezierPathWithRect_(NSMakeRect(hx-0.5, MARGIN_BOTTOM, 1, geo.plot_height))
              path.fill()
 
+    def _tooltip_string(self, val, ts, unit, is_dark):
+        if unit == 'mmol/L':
+            val_str = f"{val:.1f}"
+        else:
+            val_str = str(int(val))
+
+        try:
+            from datetime import datetime, timedelta
+            dt_obj = datetime.fromtimestamp(ts)
+            now = datetime.now()
+            if dt_obj.date() == now.date():
+                date_str = dt_obj.strftime("%H:%M")
+            elif dt_obj.date() == (now.date() - timedelta(days=1)):
+                day_str = "Yesterday"
+                time_str = dt_obj.strftime("%H:%M")
+                date_str = f"{day_str} • {time_str}"
+            else:
+                day_str = dt_obj.strftime("%b %d")
+                time_str = dt_obj.strftime("%H:%M")
+                date_str = f"{day_str} • {time_str}"
+        except:
+            date_str = "--"
+
+        full_str = f"{val_str} {unit}\n{date_str}"
+        attr_str = NSMutableAttributedString.alloc().initWithString_(full_str)
+        
+        p_style = NSMutableParagraphStyle.alloc().init()
+        p_style.setAlignment_(1) 
+        p_style.setLineSpacing_(2)
+        
+        full_len = len(full_str)
+        attr_str.addAttribute_value_range_(NSParagraphStyleAttributeName, p_style, (0, full_len))
+
+        val_only_len = len(val_str)
+        val_font = NSFont.boldSystemFontOfSize_(16.0)
+        
+        if is_dark:
+             val_color = NSColor.whiteColor()
+        else:
+             val_color = NSColor.colorWithCalibratedRed_green_blue_alpha_(0.0, 0.25, 0.36, 1.0) 
+        
+        attr_str.addAttribute_value_range_(NSFontAttributeName, val_font, (0, val_only_len))
+        attr_str.addAttribute_value_range_(NSForegroundColorAttributeName, val_color, (0, val_only_len))
+        
+        unit_start = val_only_len
+        unit_len = len(unit) + 1 
+        unit_font = NSFont.systemFontOfSize_(14.0)
+        attr_str.addAttribute_value_range_(NSFontAttributeName, unit_font, (unit_start, unit_len))
+        attr_str.addAttribute_value_range_(NSForegroundColorAttributeName, val_color, (unit_start, unit_len))
+        
+        date_start = unit_start + unit_len
+        date_len = len(full_str) - date_start
+        date_font = NSFont.systemFontOfSize_(11.0)
+        
+        if is_dark:
+            grey_color = NSColor.colorWithCalibratedWhite_alpha_(0.8, 1.0) 
+        else:
+            grey_color = NSColor.grayColor() 
+        attr_str.addAttribute_value_range_(NSFontAttributeName, date_font, (date_start, date_len))
+        attr_str.addAttribute_value_range_(NSForegroundColorAttributeName, grey_color, (date_start, date_len))
+        return attr_str
+
+    def _hide_tooltip(self):
+        self.hover_key = None
+        if hasattr(self, 'tooltip_container'):
+            self.tooltip_container.setHidden_(True)
+
     def mouseMoved_(self, event):
-        if not hasattr(self, 'points_coords') or not self.points_coords:
-            if hasattr(self, 'tooltip_container'):
-                self.tooltip_container.setHidden_(True)
+        geo = getattr(self, '_geometry', None)
+        if not geo or not geo.xs:
+            self._hide_tooltip()
             return
             
         loc = self.convertPoint_fromView_(event.locationInWindow(), None)
         x_mouse = loc.x
         
+        idx = nearest_index(geo.xs, x_mouse)
+        if idx is None or abs(geo.xs[idx] - x_mouse) >= 20:
+            self._hide_tooltip()
+            return
+
         is_dark = self.is_dark_mode()
         
-        closest = None
-        min_dist = 9999
+        # Nothing to do while the pointer stays nearest to the same point
+        key = (self._geometry_key, idx, is_dark)
+        if key == getattr(self, 'hover_key', None):
+            return
+        self.hover_key = key
+
+        if getattr(self, '_tooltip_cache_key', None) != self._geometry_key:
+            self._tooltip_cache = {}
+            self._tooltip_cache_key = self._geometry_key
+
+        px, py, val, ts, _ = geo.points[idx]
+        unit = getattr(self, 'unit', 'mg/dL')
+
+        attr_str = self._tooltip_cache.get((idx, is_dark))
+        if attr_str is None:
+            attr_str = self._tooltip_string(val, ts, unit, is_dark)
+            self._tooltip_cache[(idx, is_dark)] = attr_str
+                     
+        self.tooltip_label.setAttributedStringValue_(attr_str)
         
-        for px, py, val, ts in self.points_coords:
-            dist = abs(px - x_mouse)
-            if dist < min_dist:
-                min_dist = dist
-                closest = (px, py, val, ts)
+        tooltip_width = 105  
+        t_x = px + 10 
         
-        margin_bottom = 60 
+        view_width = self.bounds().size.width
+        if t_x + tooltip_width > view_width:
+            t_x = view_width - tooltip_width - 5
         
-        if closest and min_dist < 20: 
-            px, py, val, ts = closest
-            
-            unit = getattr(self, 'unit', 'mg/dL')
-            if unit == 'mmol/L':
-                val_str = f"{val:.1f}"
-            else:
-                val_str = str(int(val))
-
-            formatted_date = str(ts)
-            try:
-                from datetime import datetime, timedelta
-                dt_obj = datetime.strptime(ts, "%m/%d/%Y %I:%M:%S %p")
-                now = datetime.now()
-                if dt_obj.date() == now.date():
-                    date_str = dt_obj.strftime("%H:%M")
-                elif dt_obj.date() == (now.date() - timedelta(days=1)):
-                    day_str = "Yesterday"
-                    time_str = dt_obj.strftime("%H:%M")
-                    date_str = f"{day_str} • {time_str}"
-                else:
-                    day_str = dt_obj.strftime("%b %d")
-                    time_str = dt_obj.strftime("%H:%M")
-                    date_str = f"{day_str} • {time_str}"
-            except:
-                date_str = ts
-
-            full_str = f"{val_str} {unit}\n{date_str}"
-            attr_str = NSMutableAttributedString.alloc().initWithString_(full_str)
-            
-            p_style = NSMutableParagraphStyle.alloc().init()
-            p_style.setAlignment_(1) 
-            p_style.setLineSpacing_(2)
-            
-            full_len = len(full_str)
-            attr_str.addAttribute_value_range_(NSParagraphStyleAttributeName, p_style, (0, full_len))
-
-            val_only_len = len(val_str)
-            val_font = NSFont.boldSystemFontOfSize_(16.0)
-            
-            if is_dark:
-                 val_color = NSColor.whiteColor()
-            else:
-                 val_color = NSColor.colorWithCalibratedRed_green_blue_alpha_(0.0, 0.25, 0.36, 1.0) 
-            
-            attr_str.addAttribute_value_range_(NSFontAttributeName, val_font, (0, val_only_len))
-            attr_str.addAttribute_value_range_(NSForegroundColorAttributeName, val_color, (0, val_only_len))
-            
-            unit_start = val_only_len
-            unit_len = len(unit) + 1 
-            unit_font = NSFont.systemFontOfSize_(14.0)
-            attr_str.addAttribute_value_range_(NSFontAttributeName, unit_font, (unit_start, unit_len))
-            attr_str.addAttribute_value_range_(NSForegroundColorAttributeName, val_color, (unit_start, unit_len))
-            
-            date_start = unit_start + unit_len
-            date_len = len(full_str) - date_start
-            date_font = NSFont.systemFontOfSize_(11.0)
-            
-            if is_dark:
-                grey_color = NSColor.colorWithCalibratedWhite_alpha_(0.8, 1.0) 
-            else:
-                grey_color = NSColor.grayColor() 
-            attr_str.addAttribute_value_range_(NSFontAttributeName, date_font, (date_start, date_len))
-            attr_str.addAttribute_value_range_(NSForegroundColorAttributeName, grey_color, (date_start, date_len))
-                         
-            self.tooltip_label.setAttributedStringValue_(attr_str)
-            
-            tooltip_width = 105  
-            t_x = px + 10 
-            
-            view_width = self.bounds().size.width
-            if t_x + tooltip_width > view_width:
-                t_x = view_width - tooltip_width - 5
-            
-            if t_x < 0: t_x = 0
-            
-            t_y = py + 10
-            if t_y > self.bounds().size.height - 50: t_y = py - 50
-            
-            self.tooltip_container.setFrameOrigin_((t_x, t_y))
-            self.tooltip_container.setFrameSize_((tooltip_width, 50))
-            self.tooltip_label.setFrame_(NSMakeRect(0, 5, tooltip_width, 40))
-            
-            
-            if is_dark:
-                bg_color = NSColor.colorWithCalibratedRed_green_blue_alpha_(0.0, 0.1, 0.25, 0.95)
-                border_color = NSColor.colorWithCalibratedRed_green_blue_alpha_(0.2, 0.3, 0.5, 1.0)
-                self.tooltip_label.setTextColor_(NSColor.whiteColor())
-            else:
-                bg_color = NSColor.colorWithCalibratedRed_green_blue_alpha_(0.85, 0.91, 0.98, 0.95)
-                border_color = NSColor.colorWithCalibratedRed_green_blue_alpha_(0.75, 0.82, 0.92, 1.0)
-                self.tooltip_label.setTextColor_(NSColor.blackColor()) 
-                
-            self.tooltip_container.layer().setBackgroundColor_(bg_color.CGColor())
-            self.tooltip_container.layer().setBorderColor_(border_color.CGColor())
-            
-            self.tooltip_container.setHidden_(False)
+        if t_x < 0: t_x = 0
+        
+        t_y = py + 10
+        if t_y > self.bounds().size.height - 50: t_y = py - 50
+        
+        self.tooltip_container.setFrameOrigin_((t_x, t_y))
+        self.tooltip_container.setFrameSize_((tooltip_width, 50))
+        self.tooltip_label.setFrame_(NSMakeRect(0, 5, tooltip_width, 40))
+        
+        
+        if is_dark:
+            bg_color = NSColor.colorWithCalibratedRed_green_blue_alpha_(0.0, 0.1, 0.25, 0.95)
+            border_color = NSColor.colorWithCalibratedRed_green_blue_alpha_(0.2, 0.3, 0.5, 1.0)
+            self.tooltip_label.setTextColor_(NSColor.whiteColor())
         else:
-            self.tooltip_container.setHidden_(True)
+            bg_color = NSColor.colorWithCalibratedRed_green_blue_alpha_(0.85, 0.91, 0.98, 0.95)
+            border_color = NSColor.colorWithCalibratedRed_green_blue_alpha_(0.75, 0.82, 0.92, 1.0)
+            self.tooltip_label.setTextColor_(NSColor.blackColor()) 
+            
+        self.tooltip_container.layer().setBackgroundColor_(bg_color.CGColor())
+        self.tooltip_container.layer().setBorderColor_(border_color.CGColor())
+        
+        self.tooltip_container.setHidden_(False)
             
     def acceptsFirstMouse_(self, event):
         return True
@@ -723,6 +580,10 @@ class CustomGraphView(NSView):
     def update_data(self, data):
         if hasattr(self, 'plot_view'):
             self.plot_view.update_data(data)
+
+    def append_data(self, new_data, current=None, reset=False):
+        if hasattr(self, 'plot_view'):
+            self.plot_view.append_data(new_data, current=current, reset=reset)
         
     @property
     def unit(self):
@@ -776,6 +637,7 @@ class GlucoseApp(rumps.App):
             self.config.get("password"), 
             self.config.get("region", "eu")
         )
+        self.client.start_token_refresher()
         self.menu = []
         self.quit_button = None
         
@@ -870,13 +732,35 @@ class GlucoseApp(rumps.App):
         except Exception as e:
              print(f"Failed to register theme observer: {e}")
 
-        self.data_queue = queue.Queue()
+        self.scheduler = PollScheduler()
+        self.fetch_lock = threading.Lock()
+        self.last_fetch_time = 0
+        self.fetch_worker = FetchWorker(self._fetch_and_update)
+        self.poll_timer = None
+        self.reading_state = ReadingState()
+        self.local_api = None
         self.update_status_bar_appearance()
+        self.show_cached_history()
+        api_port = configured_port(self.config)
+        if api_port:
+            self.local_api = start_local_api(self.reading_state, api_port)
         self.update_glucose(None)
         
 
 
 
+    def show_cached_history(self):
+        """Draw the locally stored history right away, before the first fetch completes."""
+        try:
+            cached = self.client.get_cached_glucose() if self.client else None
+            # Following everyone, the local API is keyed by patient id; the cache isn't
+            if cached and cached.get("GraphData") and not self.config.get("follow_all_patients"):
+                self.reading_state.seed_history("", cached["GraphData"])
+            if cached and hasattr(self, 'graph_view'):
+                self.graph_view.update_data(cached.get("GraphData", ReadingSeries()))
+        except Exception as e:
+            print(f"Failed to show cached history: {e}")
+
     def setup_application_menu(self):
         try:
             main_menu = NSMenu.alloc().init()
@@ -921,6 +805,11 @@ class GlucoseApp(rumps.App):
             debug_item = NSMenuItem.alloc().initWithTitle_action_keyEquivalent_("Share Debug Logs", "shareDebugLogs:", "")
             debug_item.setTarget_(self.menu_handler)
             app_menu.addItem_(debug_item)
+
+            profiling_item = NSMenuItem.alloc().initWithTitle_action_keyEquivalent_(
+                "Stop Profiling" if profiling.is_active() else "Start Profiling", "toggleProfiling:", "")
+            profiling_item.setTarget_(self.menu_handler)
+            app_menu.addItem_(profiling_item)
             
             app_menu.addItem_(NSMenuItem.separatorItem())
             
@@ -950,11 +839,13 @@ class GlucoseApp(rumps.App):
                     delete_keyring_password(self.config.get("email"))
                 os.remove(config_path)
                 rumps.alert("Logged Out", "Your credentials have been removed. The application will now quit.")
+                app_logging.shutdown()
                 rumps.quit_application()
             except Exception as e:
                 rumps.alert("Error", f"Failed to remove credentials: {e}")
         else:
              rumps.alert("Info", "No credentials found to remove.")
+             app_logging.shutdown()
              rumps.quit_application()
 
     def load_config(self):
@@ -963,62 +854,68 @@ class GlucoseApp(rumps.App):
             return {}
             
         try:
-            if "email" in config:
-                try:
-                    import base64
-                    config["email"] = base64.b64decode(config["email"]).decode('utf-8')
-                except:
-                    pass 
-
-            if "password" in config:
-                try:
-                    import base64
-                    config["password"] = base64.b64decode(config["password"]).decode('utf-8')
-                except:
-                    pass
-            if not config.get("password") or config.get("password") == "__keyring__":
-                kr_pw = get_keyring_password(config.get("email"))
-                if kr_pw:
-                    config["password"] = kr_pw
-
-            return config
+            return decode_config(config)
         except Exception as e:
             rumps.alert("Error", f"Could not process config: {e}")
             return {}
 
-    @rumps.timer(60)
-    def update_timer(self, sender):
-        self.update_glucose(sender)
-        
-    @rumps.timer(1)
-    def ui_update_loop(self, sender):
-        try:
-            while not self.data_queue.empty():
-                data = self.data_queue.get_nowait()
-                self._update_ui_with_data(data)
-        except queue.Empty:
-            pass
+    def _schedule_next_poll(self, min_delay=1.0):
+        """Arm a one-shot timer for scheduler.next_poll_at (main thread only).
+
+        Called after every poll, so the process only wakes when a poll is due.
+        """
+        if self.poll_timer is not None:
+            self.poll_timer.invalidate()
+        delay = max(min_delay, self.scheduler.seconds_until_next())
+        self.poll_timer = NSTimer.scheduledTimerWithTimeInterval_target_selector_userInfo_repeats_(
+            delay, self.menu_handler, "pollTimerFired:", None, False)
+
+    def stop_profiling(self):
+        """Stop profiling and reveal the report, without blocking the main thread.
+
+        Joining the sampler and comparing tracemalloc snapshots takes a while.
+        """
+        def write_report():
+            report_path = profiling.stop()
+            if report_path:
+                AppHelper.callAfter(NSWorkspace.sharedWorkspace().selectFile_inFileViewerRootedAtPath_,
+                                    report_path, None)
+
+        threading.Thread(target=write_report, name="schugaa-profile-report", daemon=True).start()
+
+    def poll_timer_fired(self):
+        self.poll_timer = None
+        if self.update_glucose(None, scheduled=True) is None:
+            # Debounced by a poll that just ran; that debounce lasts at most 10s
+            self._schedule_next_poll(min_delay=10)
 
     def refresh_now(self, sender):
         self.update_glucose(sender, force=True)
 
-    def update_glucose(self, sender, force=False):
-        now = time.time()
-        last = getattr(self, 'last_fetch_time', 0)
-        if not force and now - last < 45:
-            print(f"Skipping update (Debounce: {int(45 - (now - last))}s remaining)")
-            return
-        if force and now - last < 10:
-            print(f"Skipping update (Force Debounce: {int(10 - (now - last))}s remaining)")
-            return
-             
-        self.last_fetch_time = now
-        
-        thread = threading.Thread(target=self._fetch_and_update, daemon=True)
-        thread.start()
+    def update_glucose(self, sender, force=False, scheduled=False):
+        """Ask the fetch worker for a refresh; returns its Future, or None if debounced."""
+        with self.fetch_lock:
+            now = time.time()
+            last = self.last_fetch_time
+            if scheduled:
+                force = True
+            if not force and now - last < 45:
+                print(f"Skipping update (Debounce: {int(45 - (now - last))}s remaining)")
+                return None
+            if force and now - last < 10:
+                print(f"Skipping update (Force Debounce: {int(10 - (now - last))}s remaining)")
+                return None
+                 
+            self.last_fetch_time = now
+            self.scheduler.start_poll()
+            return self.fetch_worker.request()
 
 
     def _fetch_and_update(self):
+        with profiling.section("fetch_and_update"):
+            return self._fetch_and_apply()
+
+    def _fetch_and_apply(self):
         try:
             if USE_DUMMY_DATA:
                 print("Generating dummy data...")
@@ -1031,24 +928,50 @@ class GlucoseApp(rumps.App):
                        self.config.get("password"),
                        self.config.get("region", "eu")
                    )
+                   self.client.start_token_refresher()
                 
                 print("Fetching glucose data...")
-                data = self.client.get_latest_glucose(retry=True)
-
-            if data:
-                self.data_queue.put(data)
-            else:
-                if self.client and getattr(self.client, "last_error", None):
-                    err = self.client.last_error
-                    self.data_queue.put({"Error": err.get("type"), "Message": err.get("message")})
-                else:
-                    self.data_queue.put(None)
+                data = self._fetch_followed()
+
+            signal_loss = bool(data) and data.get("Value") is None
+            decision = self.scheduler.record_poll(data.get("Timestamp") if data else None, signal_loss=signal_loss)
+            cooldown = self.client.governor.cooldown_remaining() if self.client else 0
+            if cooldown:
+                decision = self.scheduler.defer_until(time.time() + cooldown)
+            print(f"Next poll in {decision['delay']}s ({decision['reason']}, interval {decision['interval']}s, lag {decision['lag']}s)")
+
+            if data and not self.config.get("follow_all_patients"):
+                self.reading_state.update("", data)
+            elif self.client and getattr(self.client, "last_error", None):
+                err = self.client.last_error
+                data = {"Error": err.get("type"), "Message": err.get("message")}
                 
         except Exception as e:
             print(f"Error fetching glucose: {e}")
-            self.data_queue.put(None)
+            self.scheduler.record_poll(None)
+            data = None
+
+        # Hand the result to the main thread as soon as it's ready
+        AppHelper.callAfter(self._update_ui_with_data, data)
+        AppHelper.callAfter(self._schedule_next_poll)
+        return data
+
+
 
+    def _fetch_followed(self):
+        """Result for the menu-bar patient (the first connection).
 
+        With "follow_all_patients" in the config, every connected patient is
+        fetched and published to the local API under their id; the first one
+        is still the one shown in the menu bar.
+        """
+        if not self.config.get("follow_all_patients"):
+            return self.client.get_latest_glucose(retry=True)
+        results = self.client.get_all_glucose()
+        for patient_id, result in results.items():
+            if result:
+                self.reading_state.update(patient_id, result)
+        return next(iter(results.values()), None)
 
     def generate_dummy_data(self):
         import math
@@ -1078,8 +1001,8 @@ class GlucoseApp(rumps.App):
         if val > 180 or val < 70: color = 2 
         if val > 240 or val < 54: color = 3 
         
-        history = []
-        for i in range(50): 
+        history = ReadingSeries()
+        for i in range(49, -1, -1): 
             t_offset = i * 5
             hist_time = now - timedelta(minutes=t_offset)
             h_mins = hist_time.hour * 60 + hist_time.minute
@@ -1087,14 +1010,7 @@ class GlucoseApp(rumps.App):
             h_val = base_glucose + amplitude * math.sin(2 * math.pi * h_mins / period_minutes)
             h_val += random.uniform(-3, 3)
             
-            ts_str = hist_time.strftime("%-m/%-d/%Y %-I:%M:%S %p")
-            
-            history.append({
-                'Value': h_val,
-                'Timestamp': ts_str
-            })
-        
-        history.reverse() 
+            history.append(hist_time.timestamp(), h_val)
         
         sensor_activated = int(time.time()) - (30 * 60)  
         sensor_expires = sensor_activated + (14 * 24 * 60 * 60)  
@@ -1104,6 +1020,7 @@ class GlucoseApp(rumps.App):
             'Value': val,
             'Trend': trend,
             'TrendArrow': trend, 
+            'Timestamp': int(time.time()),
             'Color': color,
             'GraphData': history,
             'Unit': self.config.get("unit", "mg/dL"),
@@ -1112,6 +1029,10 @@ class GlucoseApp(rumps.App):
         }
             
     def _update_ui_with_data(self, data):
+        with UPDATE_UI_SECONDS.time(), profiling.section("update_ui_with_data"):
+            self._apply_data(data)
+
+    def _apply_data(self, data):
         try:
             if not data:
                 if self.title and "Created" not in self.title and "???" not in self.title:
@@ -1142,10 +1063,14 @@ class GlucoseApp(rumps.App):
             if sensor_activated:
                 self.last_sensor_activated = sensor_activated
                 
-            graph_data = data.get("GraphData", [])
+            graph_data = data.get("GraphData", ReadingSeries())
+            new_readings = data.get("NewReadings")
 
             if hasattr(self, 'graph_view'):
-                self.graph_view.update_data(graph_data)
+                if new_readings is not None:
+                    self.graph_view.append_data(new_readings, current=data.get("Current"), reset=data.get("Reset", False))
+                else:
+                    self.graph_view.update_data(graph_data)
 
                 
             trend = data.get("TrendArrow")
@@ -1231,7 +1156,7 @@ class GlucoseApp(rumps.App):
                 # Check for connection status from API (2 = Disconnected/Signal Loss)
                 # But prioritize showing OK if we have valid data
                 conn_status = data.get("ConnectionStatus")
-                has_valid_data = (value is not None and graph_data)
+                has_valid_data = (value is not None and (graph_data or new_readings is not None))
                 is_signal_loss = (conn_status == 2 and not has_valid_data)
 
                 if hasattr(self, "status_label"):
@@ -1378,65 +1303,10 @@ class GlucoseApp(rumps.App):
         if hasattr(self, 'sensor_label'):
             self.sensor_label.setTextColor_(text_color)
 
-def get_config_path():
-    
-    home = os.path.expanduser("~")
-    app_dir = os.path.join(home, ".schugaa")
-    if not os.path.exists(app_dir):
-        os.makedirs(app_dir, exist_ok=True)
-    return os.path.join(app_dir, "config.json")
-    
-
-def setup_logging():
-    """ Redirects stdout and stderr to a log file """
-    log_dir = os.path.expanduser("~/Library/Logs/Schugaa")
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir, exist_ok=True)
-    
-    log_file = os.path.join(log_dir, "schugaa.log")
-    try:
-        if not os.path.exists(log_file):
-            with open(log_file, "a"):
-                pass
-        os.chmod(log_file, 0o600)
-    except Exception:
-        pass
-    
-    class DualWriter:
-        def __init__(self, original_stream, file_path):
-            self.original_stream = original_stream
-            self.file = open(file_path, "a", buffering=1) 
-            
-        def write(self, message):
-            self.original_stream.write(message)
-            self.file.write(message)
-            
-        def flush(self):
-            self.original_stream.flush()
-            self.file.flush()
-
-    sys.stdout = DualWriter(sys.stdout, log_file)
-    sys.stderr = DualWriter(sys.stderr, log_file)
-    print(f"--- Log Session Started: {time.ctime()} ---")
-
-def load_config_data():
-    config_path = get_config_path()
-    if os.path.exists(config_path):
-        try:
-            with open(config_path, "r") as f:
-                return json.load(f)
-        except:
-            pass
-            
-    try:
-        with open(resource_path("config.json"), "r") as f:
-            return json.load(f)
-    except:
-        return None
-
-
 if __name__ == "__main__":
-    setup_logging()
+    app_logging.setup_logging()
+    print(f"--- Log Session Started: {time.ctime()} ---")
+    profiling.start_from_env()
 
     set_dock_icon()
     
@@ -1452,16 +1322,7 @@ if __name__ == "__main__":
 
     config = load_config_data()
     
-    needs_login = True
-    if config and config.get("email"):
-        temp_email = config.get("email")
-        try:
-            import base64
-            temp_email = base64.b64decode(temp_email).decode('utf-8')
-        except Exception:
-            pass
-        if config.get("password") or get_keyring_password(temp_email):
-            needs_login = False
+    needs_login = not has_credentials(config)
         
     def perform_login():
         try:
@@ -1541,12 +1402,7 @@ if __name__ == "__main__":
                     
                     final_region = client.region
                     
-                    import base64
-                    email_b64 = base64.b64encode(email.encode('utf-8')).decode('utf-8')
-                    password_store = "__keyring__" if set_keyring_password(email, password) else None
-                    if not password_store:
-                        import base64
-                        password_store = base64.b64encode(password.encode('utf-8')).decode('utf-8')
+                    email_b64, password_store = encode_credentials(email, password)
 
                     config = {
                         "email": email_b64,
@@ -0,0 +1,184 @@
+"""In-process counters and latency histograms for the fetch and drawing hot paths.
+
+Modules declare what they measure at import time:
+
+    GRAPH_SECONDS = metrics.histogram("graph_seconds", "Graph endpoint round trip")
+    with GRAPH_SECONDS.time():
+        ...
+    RATE_LIMITED = metrics.counter("rate_limited_total", "429 responses from LibreLinkUp")
+    RATE_LIMITED.inc()
+
+render_prometheus() and snapshot() expose everything (the local API serves
+them on /metrics and /metrics.json).
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+PREFIX = "schugaa_"
+# Seconds; from sub-millisecond parse/draw work up to slow logins
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Counter:
+    def __init__(self, name, help=""):
+        self.name = name
+        self.help = help
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class _Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Failed calls (including requests the governor never sent) would skew latency
+        if exc_type is None:
+            self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class Histogram:
+    """Cumulative buckets for Prometheus, plus the most recent samples for quick percentiles."""
+
+    def __init__(self, name, help="", buckets=DEFAULT_BUCKETS, recent=512):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._recent = deque(maxlen=recent)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._recent.append(seconds)
+            self.count += 1
+            self.sum += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def time(self):
+        return _Timer(self)
+
+    def snapshot(self):
+        with self._lock:
+            recent = sorted(self._recent)
+            counts = list(self._counts)
+            count, total, peak = self.count, self.sum, self.max
+
+        def pct(p):
+            if not recent:
+                return None
+            return round(recent[min(len(recent) - 1, int(p / 100.0 * len(recent)))] * 1000, 3)
+
+        cumulative = 0
+        buckets = {}
+        for bound, n in zip(self.buckets, counts):
+            cumulative += n
+            buckets[str(bound)] = cumulative
+        buckets["+Inf"] = count
+        return {
+            "count": count,
+            "sum_ms": round(total * 1000, 3),
+            "mean_ms": round(total / count * 1000, 3) if count else None,
+            "max_ms": round(peak * 1000, 3),
+            "p50_ms": pct(50),
+            "p95_ms": pct(95),
+            "p99_ms": pct(99),
+            "buckets": buckets,
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self.started_at = time.time()
+
+    def counter(self, name, help=""):
+        with self._lock:
+            if name not in self._counters:
+                self._counters[name] = Counter(name, help)
+            return self._counters[name]
+
+    def histogram(self, name, help="", buckets=DEFAULT_BUCKETS):
+        with self._lock:
+            if name not in self._histograms:
+                self._histograms[name] = Histogram(name, help, buckets)
+            return self._histograms[name]
+
+    def snapshot(self):
+        with self._lock:
+            counters = list(self._counters.values())
+            histograms = list(self._histograms.values())
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "counters": {c.name: c.value for c in counters},
+            "histograms": {h.name: h.snapshot() for h in histograms},
+        }
+
+    def render_prometheus(self):
+        with self._lock:
+            counters = sorted(self._counters.values(), key=lambda c: c.name)
+            histograms = sorted(self._histograms.values(), key=lambda h: h.name)
+
+        lines = []
+        for c in counters:
+            name = PREFIX + c.name
+            if c.help:
+                lines.append(f"# HELP {name} {c.help}")
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {c.value}")
+        for h in histograms:
+            name = PREFIX + h.name
+            with h._lock:
+                counts = list(h._counts)
+                count, total = h.count, h.sum
+            if h.help:
+                lines.append(f"# HELP {name} {h.help}")
+            lines.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, n in zip(h.buckets, counts):
+                cumulative += n
+                lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{le="+Inf"}} {count}')
+            lines.append(f"{name}_sum {total!r}")
+            lines.append(f"{name}_count {count}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name, help=""):
+    return REGISTRY.counter(name, help)
+
+
+def histogram(name, help="", buckets=DEFAULT_BUCKETS):
+    return REGISTRY.histogram(name, help, buckets)
+
+
+def snapshot():
+    return REGISTRY.snapshot()
+
+
+def render_prometheus():
+    return REGISTRY.render_prometheus()
@@ -0,0 +1,132 @@
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+_lock = threading.Lock()
+# Bytes last written (or found on disk) per path, so unchanged data is never rewritten
+_written = {}
+# Each write call gets a sequence number; a deferred write older than what
+# another thread already put on disk is dropped when its batch flushes.
+_sequence = 0
+_written_seq = {}
+# Batches are per thread: a batch open on one thread never delays another's writes
+_local = threading.local()
+
+
+def _batch():
+    if not hasattr(_local, "pending"):
+        _local.depth = 0
+        _local.pending = {}
+    return _local
+
+
+def _same_as_disk(path, payload):
+    # The cache is only good while the file is still there (it may have been deleted by hand)
+    if path in _written and os.path.exists(path):
+        return _written[path] == payload
+    try:
+        with open(path, "rb") as f:
+            current = f.read()
+    except OSError:
+        return False
+    _written[path] = current
+    return current == payload
+
+
+def _fsync_dir(dirpath):
+    try:
+        fd = os.open(dirpath, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _write_atomic(path, payload, mode):
+    dirpath = os.path.dirname(path) or "."
+    fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=dirpath)
+    try:
+        try:
+            os.fchmod(fd, mode)
+        except (AttributeError, OSError):
+            pass
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(dirpath)
+
+
+def write_bytes(path, payload, mode=0o600):
+    """Atomically replace path with payload (temp file, fsync, rename).
+
+    Returns False without touching the disk when the content is unchanged or
+    when the write was deferred by an enclosing batched() block.
+    """
+    global _sequence
+    path = os.path.abspath(path)
+    batch = _batch()
+    with _lock:
+        _sequence += 1
+        if batch.depth:
+            batch.pending[path] = (_sequence, payload, mode)
+            return False
+        return _write_locked(path, payload, mode, _sequence)
+
+
+def _write_locked(path, payload, mode, seq):
+    if seq < _written_seq.get(path, 0):
+        # Another thread wrote newer data while this write sat in a batch
+        return False
+    _written_seq[path] = seq
+    if _same_as_disk(path, payload):
+        return False
+    _write_atomic(path, payload, mode)
+    _written[path] = payload
+    return True
+
+
+def write_json(path, data, indent=None, mode=0o600):
+    return write_bytes(path, json.dumps(data, indent=indent).encode("utf-8"), mode)
+
+
+def flush():
+    """Write out this thread's writes deferred by batched(); returns the number of files written."""
+    batch = _batch()
+    pending = list(batch.pending.items())
+    batch.pending.clear()
+    written = 0
+    for path, (seq, payload, mode) in pending:
+        try:
+            with _lock:
+                if _write_locked(path, payload, mode, seq):
+                    written += 1
+        except Exception as e:
+            print(f"Failed to write {path}: {e}")
+    return written
+
+
+@contextmanager
+def batched():
+    """Defer writes made on this thread inside the block and write each file once at the end."""
+    batch = _batch()
+    batch.depth += 1
+    try:
+        yield
+    finally:
+        batch.depth -= 1
+        if batch.depth == 0:
+            flush()
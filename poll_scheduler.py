@@ -0,0 +1,126 @@
+import time
+from collections import deque
+
+
+class PollScheduler:
+    """Decides when to poll LibreLinkUp next, based on when readings actually arrive.
+
+    The sensor reports on a fixed cadence (about once a minute via the phone
+    app), so instead of polling on a wall-clock timer we predict when the next
+    reading will be available upstream and poll just after that. The expected
+    upload lag is learned: a poll that finds no new reading widens it, a poll
+    that does narrows it again. When data stops arriving altogether the delay
+    backs off exponentially.
+    """
+
+    DEFAULT_INTERVAL = 60
+    MIN_INTERVAL = 30
+    MAX_INTERVAL = 15 * 60
+
+    def __init__(self, interval=DEFAULT_INTERVAL, lag=10, min_lag=3, max_lag=45,
+                 retry_delay=10, max_delay=5 * 60, stale_after=3):
+        self.default_interval = interval
+        self.lag = lag
+        self.min_lag = min_lag
+        self.max_lag = max_lag
+        self.retry_delay = retry_delay
+        self.max_delay = max_delay
+        # Number of expected readings that may be missed before backing off
+        self.stale_after = stale_after
+
+        self.reading_times = deque(maxlen=16)
+        self.misses = 0
+        self.failures = 0
+        self.next_poll_at = 0
+        self.in_flight = False
+        self.last_decision = {"reason": "initial", "next_poll_at": 0, "delay": 0}
+
+    def interval(self):
+        """Median gap between consecutive readings, or the default until enough are seen."""
+        times = list(self.reading_times)
+        gaps = sorted(b - a for a, b in zip(times, times[1:]) if b > a)
+        if not gaps:
+            return self.default_interval
+        median = gaps[len(gaps) // 2]
+        return max(self.MIN_INTERVAL, min(self.MAX_INTERVAL, median))
+
+    def last_reading(self):
+        return self.reading_times[-1] if self.reading_times else None
+
+    def is_due(self, now=None):
+        now = time.time() if now is None else now
+        return not self.in_flight and now >= self.next_poll_at
+
+    def seconds_until_next(self, now=None):
+        now = time.time() if now is None else now
+        return max(0, self.next_poll_at - now)
+
+    def start_poll(self):
+        self.in_flight = True
+
+    def record_poll(self, reading_ts, now=None, signal_loss=False):
+        """Record the outcome of a poll; reading_ts is the newest reading's epoch, or None on failure.
+
+        signal_loss marks a successful answer without a current reading (the
+        sensor is out of range); polling keeps its normal cadence so the
+        reading shows up as soon as the sensor reconnects.
+        """
+        now = time.time() if now is None else now
+        self.in_flight = False
+
+        if reading_ts is None and signal_loss:
+            self.failures = 0
+            return self._decide(now, now + self.interval(), "signal_loss")
+
+        if reading_ts is None:
+            self.failures += 1
+            delay = min(self.max_delay, self.retry_delay * (2 ** self.failures))
+            return self._decide(now, now + delay, "error_backoff")
+        self.failures = 0
+
+        last = self.last_reading()
+        if last is None or reading_ts > last:
+            self.reading_times.append(int(reading_ts))
+            self.misses = 0
+            # Found it on time; tighten the expected lag a little
+            self.lag = max(self.min_lag, self.lag - 1)
+        else:
+            self.misses += 1
+
+        interval = self.interval()
+        last = self.last_reading()
+        expected = last + interval
+
+        if self.misses > self.stale_after:
+            delay = min(self.max_delay, interval * (2 ** (self.misses - self.stale_after)))
+            return self._decide(now, now + delay, "stale_backoff")
+
+        if self.misses and now >= expected + self.lag:
+            # The reading we expected isn't there yet: assume uploads lag more
+            self.lag = min(self.max_lag, self.lag + 5)
+            return self._decide(now, now + self.retry_delay, "reading_late")
+
+        # Skip ahead whole intervals if we've fallen behind the cadence
+        while expected + self.lag <= now:
+            expected += interval
+        return self._decide(now, expected + self.lag, "expected_reading")
+
+    def defer_until(self, at, reason="rate_limited", now=None):
+        """Push the next poll back to at least `at`, e.g. while a rate-limit cooldown is active."""
+        now = time.time() if now is None else now
+        if at > self.next_poll_at:
+            return self._decide(now, at, reason)
+        return self.last_decision
+
+    def _decide(self, now, at, reason):
+        self.next_poll_at = at
+        self.last_decision = {
+            "reason": reason,
+            "next_poll_at": at,
+            "delay": round(at - now, 1),
+            "interval": self.interval(),
+            "lag": self.lag,
+            "misses": self.misses,
+            "failures": self.failures,
+        }
+        return self.last_decision
@@ -0,0 +1,255 @@
+"""Opt-in sampling profiler for the fetch and render paths.
+
+Enable with SCHUGAA_PROFILE=1 (or the "Start Profiling" menu item). While
+active, a background thread samples the stacks of threads inside a
+profiled section every few milliseconds, and tracemalloc tracks
+allocations. Reports land in ~/Library/Logs/Schugaa/profiles:
+
+    profile-<time>.txt      per-section timings, hottest functions, memory growth
+    profile-<time>.folded   collapsed stacks for flamegraph.pl / speedscope
+
+When disabled, section() returns a shared no-op context manager.
+"""
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from datetime import datetime
+
+import app_logging
+
+PROFILE_ENV = "SCHUGAA_PROFILE"
+INTERVAL = 0.005
+# While enabled via the environment, also write a report this often so a hung app still leaves one
+REPORT_EVERY = 5 * 60
+MAX_DEPTH = 64
+TRACEMALLOC_FRAMES = 16
+
+_active = False
+_profiler = None
+_control_lock = threading.Lock()
+# Whether start() turned tracemalloc on (and so may turn it off again)
+_owns_tracemalloc = False
+
+
+class _NullSection:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SECTION = _NullSection()
+
+
+class _Section:
+    __slots__ = ("profiler", "name", "start", "memory")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler._enter(self.name)
+        self.memory = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        allocated = tracemalloc.get_traced_memory()[0] - self.memory
+        self.profiler._exit(self.name, elapsed, allocated)
+        return False
+
+
+def _snapshot():
+    # Leave out the profiler's own bookkeeping
+    return tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.Filter(False, __file__), tracemalloc.Filter(False, tracemalloc.__file__)])
+
+
+class Profiler:
+    def __init__(self, interval=INTERVAL, report_dir=None, report_every=None):
+        self.interval = interval
+        self.report_dir = report_dir or os.path.join(app_logging.LOG_DIR, "profiles")
+        self.report_every = report_every
+        self._lock = threading.Lock()
+        # thread id -> stack of section names currently entered on that thread
+        self._sections = {}
+        self._stats = defaultdict(lambda: {"calls": 0, "total": 0.0, "max": 0.0, "allocated": 0})
+        self._samples = defaultdict(Counter)
+        self._sample_count = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._baseline = None
+        self.started_at = None
+
+    def start(self):
+        self._baseline = _snapshot()
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._sample_loop, name="schugaa-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+        return self.write_report()
+
+    def _enter(self, name):
+        tid = threading.get_ident()
+        with self._lock:
+            self._sections.setdefault(tid, []).append(name)
+
+    def _exit(self, name, elapsed, allocated):
+        tid = threading.get_ident()
+        with self._lock:
+            stack = self._sections.get(tid)
+            if stack:
+                stack.pop()
+                if not stack:
+                    del self._sections[tid]
+            stats = self._stats[name]
+            stats["calls"] += 1
+            stats["total"] += elapsed
+            stats["allocated"] += allocated
+            if elapsed > stats["max"]:
+                stats["max"] = elapsed
+
+    def _sample_loop(self):
+        last_report = time.monotonic()
+        while not self._stop.wait(self.interval):
+            self._sample()
+            if self.report_every and time.monotonic() - last_report >= self.report_every:
+                last_report = time.monotonic()
+                self.write_report()
+
+    def _sample(self):
+        with self._lock:
+            active = {tid: stack[-1] for tid, stack in self._sections.items()}
+        if not active:
+            return
+        frames = sys._current_frames()
+        with self._lock:
+            for tid, name in active.items():
+                frame = frames.get(tid)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_DEPTH:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.reverse()
+                self._samples[name][";".join(stack)] += 1
+                self._sample_count += 1
+
+    def write_report(self):
+        try:
+            os.makedirs(self.report_dir, exist_ok=True)
+            stem = os.path.join(self.report_dir, f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+            with self._lock:
+                stats = {name: dict(s) for name, s in self._stats.items()}
+                samples = {name: Counter(c) for name, c in self._samples.items()}
+                sample_count = self._sample_count
+            with open(stem + ".txt", "w") as f:
+                f.write(self._render(stats, samples, sample_count))
+            with open(stem + ".folded", "w") as f:
+                for name, counts in samples.items():
+                    for stack, count in counts.most_common():
+                        f.write(f"{name};{stack} {count}\n")
+            print(f"Profiling report written to {stem}.txt")
+            return stem + ".txt"
+        except Exception as e:
+            print(f"Failed to write profiling report: {e}")
+            return None
+
+    def _render(self, stats, samples, sample_count):
+        duration = time.time() - self.started_at
+        lines = [
+            f"Schugaa profile, {datetime.fromtimestamp(self.started_at):%Y-%m-%d %H:%M:%S}, "
+            f"{duration:.1f}s, sampled every {self.interval * 1000:g} ms, {sample_count} samples",
+            "",
+            f"{'section':<24}{'calls':>8}{'total ms':>12}{'mean ms':>10}{'max ms':>10}{'alloc KiB':>12}",
+        ]
+        for name, s in sorted(stats.items(), key=lambda item: -item[1]["total"]):
+            mean = s["total"] / s["calls"] * 1000 if s["calls"] else 0
+            lines.append(f"{name:<24}{s['calls']:>8}{s['total'] * 1000:>12.1f}{mean:>10.2f}"
+                         f"{s['max'] * 1000:>10.2f}{s['allocated'] / 1024:>12.1f}")
+
+        for name, counts in samples.items():
+            total = sum(counts.values())
+            own = Counter()
+            cumulative = Counter()
+            for stack, count in counts.items():
+                functions = stack.split(";")
+                own[functions[-1]] += count
+                for function in set(functions):
+                    cumulative[function] += count
+            lines += ["", f"{name}: {total} samples", "  self%   cum%  function"]
+            for function, count in own.most_common(15):
+                lines.append(f"  {count / total * 100:5.1f}  {cumulative[function] / total * 100:5.1f}  {function}")
+
+        if tracemalloc.is_tracing() and self._baseline is not None:
+            lines += ["", "Memory growth since profiling started (tracemalloc):"]
+            for diff in _snapshot().compare_to(self._baseline, "lineno")[:20]:
+                lines.append(f"  {diff.size_diff / 1024:+10.1f} KiB {diff.count_diff:+8d} blocks  {diff.traceback[0]}")
+            current, peak = tracemalloc.get_traced_memory()
+            lines.append(f"  traced now {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB")
+        return "\n".join(lines) + "\n"
+
+
+def section(name):
+    """Context manager around a hot path; free when profiling is off."""
+    # One read: stop() may clear _profiler on another thread at any moment
+    profiler = _profiler
+    if profiler is None:
+        return _NULL_SECTION
+    return _Section(profiler, name)
+
+
+def is_active():
+    return _active
+
+
+def start(interval=INTERVAL, report_every=None):
+    global _active, _profiler, _owns_tracemalloc
+    with _control_lock:
+        if _active:
+            return _profiler
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            _owns_tracemalloc = True
+        profiler = Profiler(interval, report_every=report_every)
+        profiler.start()
+        _profiler = profiler
+        _active = True
+        print(f"Profiling started (sampling every {interval * 1000:g} ms)")
+        return profiler
+
+
+def stop():
+    """Stop profiling and write the report; returns its path, or None if profiling was off."""
+    global _active, _profiler, _owns_tracemalloc
+    with _control_lock:
+        if not _active:
+            return None
+        _active = False
+        profiler, _profiler = _profiler, None
+    path = profiler.stop()
+    with _control_lock:
+        # Profiling may have been restarted while the report was being written
+        if _profiler is None and _owns_tracemalloc:
+            tracemalloc.stop()
+            _owns_tracemalloc = False
+    return path
+
+
+def start_from_env():
+    if os.environ.get(PROFILE_ENV, "").lower() in ("1", "true", "yes", "on"):
+        start(report_every=REPORT_EVERY)
@@ -0,0 +1,140 @@
+import json
+import threading
+import time
+from collections import deque
+
+
+class Event:
+    __slots__ = ("id", "name", "data", "time", "frame")
+
+    def __init__(self, event_id, name, data):
+        self.id = event_id
+        self.name = name
+        self.data = data
+        self.time = time.time()
+        # Encoded once, written as-is to every server-sent-events subscriber
+        payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+        self.frame = f"id: {event_id}\nevent: {name}\ndata: {payload}\n\n".encode("utf-8")
+
+
+class Subscription:
+    """A subscriber's queue. Slow readers lose the oldest events, never block the publisher."""
+
+    def __init__(self, broker, maxlen=256):
+        self._broker = broker
+        self._events = deque(maxlen=maxlen)
+        self._cond = threading.Condition()
+        self.closed = False
+
+    def _push(self, event):
+        with self._cond:
+            self._events.append(event)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Wait for events and return all that are queued (possibly none on timeout)."""
+        with self._cond:
+            if not self._events and not self.closed:
+                self._cond.wait(timeout)
+            events = list(self._events)
+            self._events.clear()
+            return events
+
+    def close(self):
+        self._broker.unsubscribe(self)
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class EventBroker:
+    """Fans out reading, connection and sensor events to subscribers as they happen.
+
+    Subscriptions are queues for consumers on their own thread (the SSE
+    endpoint); listeners are callbacks run on the publisher's thread. The
+    last `backlog` events are kept so a reconnecting client can resume from
+    its Last-Event-ID.
+    """
+
+    def __init__(self, backlog=100):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._listeners = []
+        self._backlog = deque(maxlen=backlog)
+        self._next_id = 1
+        self.published = 0
+
+    def publish(self, name, data):
+        with self._lock:
+            event = Event(self._next_id, name, data)
+            self._next_id += 1
+            self.published += 1
+            self._backlog.append(event)
+            subscriptions = list(self._subscriptions)
+            listeners = list(self._listeners)
+        for subscription in subscriptions:
+            subscription._push(event)
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                print(f"Event listener failed: {e}")
+        return event
+
+    def subscribe(self, last_event_id=None, maxlen=256):
+        subscription = Subscription(self, maxlen)
+        with self._lock:
+            if last_event_id is not None:
+                for event in self._backlog:
+                    if event.id > last_event_id:
+                        subscription._events.append(event)
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def add_listener(self, callback):
+        with self._lock:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscriptions) + len(self._listeners)
+
+
+def result_events(patient_id, previous, latest, new_readings=None):
+    """(name, data) events for what changed between two /latest snapshots of a patient."""
+    previous = previous or {}
+    events = []
+
+    if latest.get("value") is not None and not latest.get("signal_loss") and \
+            latest.get("timestamp") != previous.get("timestamp"):
+        data = dict(latest)
+        if new_readings:
+            data["new_readings"] = [[ts, value] for ts, value in new_readings]
+        events.append(("reading", data))
+
+    if (latest.get("connection_status") != previous.get("connection_status") or
+            latest.get("signal_loss") != previous.get("signal_loss", False)):
+        events.append(("connection", {
+            "patient_id": patient_id,
+            "connection_status": latest.get("connection_status"),
+            "signal_loss": latest.get("signal_loss"),
+        }))
+
+    if latest.get("sensor_activated") and latest.get("sensor_activated") != previous.get("sensor_activated"):
+        events.append(("sensor", {
+            "patient_id": patient_id,
+            "sensor_activated": latest.get("sensor_activated"),
+            "sensor_expires": latest.get("sensor_expires"),
+            "new_sensor": bool(previous.get("sensor_activated")),
+        }))
+
+    return events
@@ -0,0 +1,198 @@
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import persistence
+
+
+class RateLimitCooldown(Exception):
+    """Raised instead of sending a request while the governor is holding requests back."""
+
+    def __init__(self, retry_after, reason="cooldown"):
+        self.retry_after = retry_after
+        self.reason = reason
+        super().__init__(f"Request held back ({reason}); retry in {int(retry_after)}s")
+
+
+def parse_retry_after(value, now=None):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date), or None."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    if value.isdigit():
+        return int(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except Exception:
+        return None
+    if when is None:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    now = time.time() if now is None else now
+    return max(0, int(when.timestamp() - now))
+
+
+def retry_delay(attempt, base=2, cap=10):
+    """Jittered exponential wait before retrying a failed call (attempt counts from 0).
+
+    Local to the caller: unlike RequestGovernor.next_backoff() it neither
+    reads nor changes the persisted rate-limit state.
+    """
+    delay = min(cap, base * (2 ** attempt))
+    return random.uniform(delay / 2, delay)
+
+
+class RequestGovernor:
+    """Single request budget for every LibreLinkUp call (login, connections, graph).
+
+    Requests draw from a token bucket so bursts (relaunches, retries, menu
+    refreshes) stay under Abbott's limits. A 429 puts the governor into a
+    cooldown that honours Retry-After and otherwise grows with decorrelated
+    jitter; the cooldown is persisted so a relaunch doesn't hit the API again
+    straight away.
+    """
+
+    def __init__(self, capacity=6, refill_per_second=6 / 60.0, base_delay=5, max_delay=30 * 60,
+                 state_file="ratelimit.json"):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.state_file = state_file
+
+        self._lock = threading.Lock()
+        self._tokens = float(capacity)
+        self._last_refill = time.monotonic()
+        self._last_backoff = base_delay
+        self.cooldown_until = 0
+        self.rate_limit_count = 0
+        # Per-thread allowance set by waiting()
+        self._local = threading.local()
+
+        self._load_state()
+
+    def _get_state_path(self):
+        home = os.path.expanduser("~")
+        app_dir = os.path.join(home, ".schugaa")
+        if not os.path.exists(app_dir):
+            os.makedirs(app_dir, exist_ok=True)
+        return os.path.join(app_dir, self.state_file)
+
+    def _load_state(self):
+        try:
+            path = self._get_state_path()
+            if os.path.exists(path):
+                with open(path, 'r') as f:
+                    data = json.load(f)
+                self.cooldown_until = data.get("cooldown_until", 0)
+                self._last_backoff = data.get("last_backoff", self.base_delay)
+                self.rate_limit_count = data.get("rate_limit_count", 0)
+                if self.cooldown_until > time.time():
+                    print(f"Rate limit cooldown active for {int(self.cooldown_until - time.time())}s")
+        except Exception as e:
+            print(f"Failed to load rate limit state: {e}")
+
+    def _save_state(self):
+        try:
+            data = {
+                "cooldown_until": self.cooldown_until,
+                "last_backoff": self._last_backoff,
+                "rate_limit_count": self.rate_limit_count,
+            }
+            persistence.write_json(self._get_state_path(), data)
+        except Exception as e:
+            print(f"Failed to save rate limit state: {e}")
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.refill_per_second)
+        self._last_refill = now
+
+    def cooldown_remaining(self):
+        return max(0, self.cooldown_until - time.time())
+
+    def before_request(self):
+        """Take one token, or raise RateLimitCooldown if the request must wait.
+
+        Inside waiting(), a request short of budget sleeps until a token
+        refills (within the allowance) instead of raising.
+        """
+        deadline = time.monotonic() + getattr(self._local, "max_wait", 0)
+        while True:
+            with self._lock:
+                remaining = self.cooldown_remaining()
+                if remaining > 0:
+                    raise RateLimitCooldown(remaining, "cooldown")
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.refill_per_second
+            if time.monotonic() + wait > deadline:
+                raise RateLimitCooldown(wait, "budget")
+            time.sleep(wait)
+
+    @contextmanager
+    def waiting(self, max_wait):
+        """Let requests on this thread wait up to max_wait seconds for budget.
+
+        Used to spread a burst (one graph call per followed patient) over the
+        refill rate. A cooldown after a 429 still fails at once.
+        """
+        previous = getattr(self._local, "max_wait", 0)
+        self._local.max_wait = max_wait
+        try:
+            yield
+        finally:
+            self._local.max_wait = previous
+
+    def next_backoff(self):
+        """Decorrelated jitter: random between base and 3x the previous delay, capped."""
+        with self._lock:
+            delay = min(self.max_delay, random.uniform(self.base_delay, self._last_backoff * 3))
+            self._last_backoff = delay
+            return delay
+
+    def record_response(self, status_code, retry_after=None):
+        if status_code == 429:
+            self.record_rate_limit(retry_after)
+            return
+        if 200 <= status_code < 400:
+            with self._lock:
+                changed = self._last_backoff != self.base_delay or self.cooldown_until
+                self._last_backoff = self.base_delay
+                self.cooldown_until = 0
+            if changed:
+                self._save_state()
+
+    def record_rate_limit(self, retry_after=None):
+        server_delay = parse_retry_after(retry_after)
+        if server_delay is not None:
+            # The server told us when it will accept requests again; a little
+            # jitter keeps several instances from retrying in lockstep.
+            delay = server_delay + random.uniform(0, 2)
+        else:
+            delay = self.next_backoff()
+        with self._lock:
+            self.cooldown_until = max(self.cooldown_until, time.time() + delay)
+            self.rate_limit_count += 1
+            # Don't let queued requests fire the moment the cooldown ends
+            self._tokens = min(self._tokens, 1.0)
+        print(f"Rate limited by LibreLinkUp; cooling down until {datetime.fromtimestamp(self.cooldown_until).strftime('%H:%M:%S')}")
+        self._save_state()
+
+    def stats(self):
+        with self._lock:
+            self._refill()
+            return {
+                "tokens": round(self._tokens, 2),
+                "cooldown_remaining": round(self.cooldown_remaining(), 1),
+                "last_backoff": round(self._last_backoff, 1),
+                "rate_limit_count": self.rate_limit_count,
+            }
@@ -0,0 +1,144 @@
+import os
+import sqlite3
+import threading
+
+
+class ReadingStore:
+    """Append-only local history of glucose readings.
+
+    Readings are keyed by (patient_id, factory_ts), where factory_ts is the
+    sensor's FactoryTimestamp in UTC epoch seconds. Inserting a reading that is
+    already stored is a no-op, so callers can hand over whole API responses
+    without deduplicating first.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or self._get_default_path()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS readings ("
+                " patient_id TEXT NOT NULL DEFAULT '',"
+                " factory_ts INTEGER NOT NULL,"
+                " value REAL NOT NULL,"
+                " trend INTEGER,"
+                " PRIMARY KEY (patient_id, factory_ts)"
+                ") WITHOUT ROWID"
+            )
+            # latest_patient_id() orders across patients
+            self._conn.execute("CREATE INDEX IF NOT EXISTS readings_ts ON readings (factory_ts)")
+            self._conn.commit()
+        try:
+            os.chmod(self.path, 0o600)
+        except Exception:
+            pass
+
+    def _get_default_path(self):
+        home = os.path.expanduser("~")
+        app_dir = os.path.join(home, ".schugaa")
+        if not os.path.exists(app_dir):
+            os.makedirs(app_dir, exist_ok=True)
+        return os.path.join(app_dir, "readings.db")
+
+    def add_readings(self, readings, patient_id=""):
+        """Insert (factory_ts, value, trend) tuples, skipping ones already stored.
+
+        Returns the number of readings that were new.
+        """
+        rows = [(patient_id or "", int(ts), float(value), trend) for ts, value, trend in readings]
+        if not rows:
+            return 0
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO readings (patient_id, factory_ts, value, trend) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            return self._conn.total_changes - before
+
+    def get_range(self, start=None, end=None, patient_id="", limit=None):
+        """Return (factory_ts, value, trend) tuples with start <= ts <= end, oldest first.
+
+        With a limit, the newest `limit` readings of the range are returned.
+        """
+        query = "SELECT factory_ts, value, trend FROM readings WHERE patient_id = ?"
+        params = [patient_id or ""]
+        if start is not None:
+            query += " AND factory_ts >= ?"
+            params.append(int(start))
+        if end is not None:
+            query += " AND factory_ts <= ?"
+            params.append(int(end))
+
+        with self._lock:
+            if limit is not None:
+                rows = self._conn.execute(
+                    query + " ORDER BY factory_ts DESC LIMIT ?", params + [int(limit)]
+                ).fetchall()
+                rows.reverse()
+                return rows
+            return self._conn.execute(query + " ORDER BY factory_ts", params).fetchall()
+
+    def iter_range(self, start=None, end=None, patient_id="", chunk_size=10000):
+        """Yield lists of up to chunk_size (factory_ts, value, trend) tuples, oldest first.
+
+        Each chunk is a separate keyset query, so memory stays bounded and
+        polls can keep inserting while a long range is being read.
+        """
+        query = ("SELECT factory_ts, value, trend FROM readings"
+                 " WHERE patient_id = ? AND factory_ts > ? AND factory_ts <= ?"
+                 " ORDER BY factory_ts LIMIT ?")
+        after = int(start) - 1 if start is not None else -(2 ** 63)
+        end = int(end) if end is not None else 2 ** 63 - 1
+        while True:
+            with self._lock:
+                rows = self._conn.execute(query, (patient_id or "", after, end, int(chunk_size))).fetchall()
+            if not rows:
+                return
+            yield rows
+            if len(rows) < chunk_size:
+                return
+            after = rows[-1][0]
+
+    def timestamps_between(self, start, end, patient_id=""):
+        """Sorted factory timestamps stored with start <= ts <= end."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT factory_ts FROM readings WHERE patient_id = ? AND factory_ts BETWEEN ? AND ?"
+                " ORDER BY factory_ts",
+                (patient_id or "", int(start), int(end)),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def latest_timestamp(self, patient_id=""):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(factory_ts) FROM readings WHERE patient_id = ?", (patient_id or "",)
+            ).fetchone()
+        return row[0] if row else None
+
+    def latest_patient_id(self):
+        """Patient whose reading was stored most recently, or None for an empty store."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT patient_id FROM readings ORDER BY factory_ts DESC LIMIT 1"
+            ).fetchone()
+        return row[0] if row else None
+
+    def count(self, patient_id=None):
+        with self._lock:
+            if patient_id is None:
+                row = self._conn.execute("SELECT COUNT(*) FROM readings").fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT COUNT(*) FROM readings WHERE patient_id = ?", (patient_id,)
+                ).fetchone()
+        return row[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,81 @@
+from array import array
+from datetime import datetime
+
+MMOL_FACTOR = 18.0182
+
+
+def unit_factor(unit):
+    return MMOL_FACTOR if unit == "mmol/L" else 1.0
+
+
+def to_display_value(value, unit):
+    if unit == "mmol/L":
+        return value / MMOL_FACTOR
+    return value
+
+
+class ReadingSeries:
+    """Glucose readings as parallel arrays of epoch seconds and mg/dL values.
+
+    This is what the API client hands to the UI and the local store: no
+    per-reading dicts or formatted timestamp strings. Timestamps are only
+    turned into text at display time via format_time().
+    """
+
+    __slots__ = ("times", "values")
+
+    def __init__(self, times=(), values=()):
+        self.times = array("q", times)
+        self.values = array("d", values)
+
+    @classmethod
+    def from_pairs(cls, pairs):
+        series = cls()
+        for ts, value in pairs:
+            series.append(ts, value)
+        return series
+
+    def append(self, ts, value):
+        self.times.append(int(ts))
+        self.values.append(float(value))
+
+    def extend(self, other):
+        if isinstance(other, ReadingSeries):
+            self.times.extend(other.times)
+            self.values.extend(other.values)
+        else:
+            for ts, value in other:
+                self.append(ts, value)
+
+    def copy(self):
+        return ReadingSeries(self.times, self.values)
+
+    def tail(self, count):
+        if count >= len(self.times):
+            return self.copy()
+        return ReadingSeries(self.times[-count:], self.values[-count:])
+
+    def last_time(self):
+        return self.times[-1] if self.times else None
+
+    def __len__(self):
+        return len(self.times)
+
+    def __bool__(self):
+        return len(self.times) > 0
+
+    def __iter__(self):
+        return zip(self.times, self.values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ReadingSeries(self.times[index], self.values[index])
+        return self.times[index], self.values[index]
+
+    def __repr__(self):
+        return f"ReadingSeries({len(self.times)} readings)"
+
+
+def format_time(ts, fmt="%H:%M"):
+    """Format epoch seconds in local time, for display only."""
+    return datetime.fromtimestamp(ts).strftime(fmt)